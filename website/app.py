@@ -4,33 +4,33 @@ import pandas as pd
 import plotly.graph_objs as go
 import plotly.express as px
 import os
+import flask
 from dash import dcc, html
 from dash.dependencies import Input, Output
 
+# Loaders live in gcs_cache so offline build scripts can use them without creating the app
+from gcs_cache import (
+    get_storage_client, get_csv_from_gcs, get_xlsx_from_gcs, prefetch_blobs, read_parquet_from_gcs,
+)
+from callback_cache import cache_stats
+import figure_cache
+import session_series
+from lazy_init import start_warm_up
 
-from google.cloud import storage
-from io import StringIO, BytesIO
-
-def get_csv_from_gcs(bucket_name, source_blob_name, header=None):
-    """Downloads a blob from the bucket."""
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(source_blob_name)
-    data = blob.download_as_text()
-    return pd.read_csv(StringIO(data), header=header)
-
-def get_xlsx_from_gcs(bucket_name, source_blob_name, header=None):
-    """Downloads a blob from the bucket."""
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(source_blob_name)
-    data = blob.download_as_bytes()
-    return pd.read_excel(BytesIO(data), header=header)
-
-# Initialize the Dash app with pages support
-app = dash.Dash(__name__, use_pages=True)
+# Initialize the Dash app with pages support. Page layouts may be functions that build their
+# content on first visit, so Dash must not call them all up front to validate callbacks
+app = dash.Dash(__name__, use_pages=True, suppress_callback_exceptions=True)
 app.title = "CS 163 Project EV"
 server = app.server
+server.register_blueprint(figure_cache.blueprint)
+server.register_blueprint(session_series.blueprint)
+
+# Debugging aid only, so it isn't served unless asked for
+if os.environ.get("CACHE_STATS_ROUTE", "0") == "1":
+    @server.route("/_cache/stats")
+    def callback_cache_stats():
+        """Hit/miss counters of the memoized callbacks in this worker process."""
+        return flask.jsonify(cache_stats())
 
 # Define the layout with a navigation bar using registered pages
 app.layout = html.Div([
@@ -53,4 +53,5 @@ app.layout = html.Div([
 ])
 
 if __name__ == '__main__':
+    start_warm_up()
     app.run_server(debug=True)
@@ -0,0 +1,131 @@
+"""Rolling-origin back-tests for the price and Pacific energy forecasters.
+
+The EVvsGas page's 2024 back-test is a single hold-out year. Here each series is cut at many
+origins (the last `folds` months, every `step` months), a model is fitted on the history up to
+each origin and scored on the following `horizon` months. Folds run in parallel through
+forecasting.run_forecasts and every fold's fit goes through the forecast cache, so a nightly
+rerun only fits folds whose training data changed:
+
+    python build_artifacts.py backtest --folds 24 --horizon 12
+
+The result is one row per (series, months ahead) with MAE, MAPE and interval coverage.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import ev_aggregates
+from evvsgas_data import ARTIFACT_DIR
+from forecasting import BACKTEST_PARAMS, DEFAULT_TIMEOUT, PRICE_SERIES, make_task, run_forecasts
+
+BACKTEST_PATH = os.path.join(ARTIFACT_DIR, "backtest_metrics.parquet")
+
+DEFAULT_FOLDS = 24
+DEFAULT_STEP = 1
+DEFAULT_HORIZON = 12
+MIN_TRAIN = 24
+
+
+def rolling_origins(ds, folds=DEFAULT_FOLDS, step=DEFAULT_STEP, min_train=MIN_TRAIN):
+    """Cutoff dates, oldest first: every `step`-th of the last `folds` observations before the
+    final one, keeping at least `min_train` observations up to each cutoff."""
+    ds = pd.Series(pd.to_datetime(ds)).sort_values(ignore_index=True)
+    positions = np.arange(len(ds) - 2, min_train - 2, -step)[:folds]
+    return list(ds.iloc[positions[::-1]])
+
+
+def fold_tasks(key, history, horizon=DEFAULT_HORIZON, params=None, **origin_args):
+    """One forecast task per rolling origin of `history`, keyed by `key` plus the cutoff."""
+    history = history.sort_values('ds')
+    tasks = []
+    for cutoff in rolling_origins(history['ds'], **origin_args):
+        train = history[history['ds'] <= cutoff]
+        tasks.append(make_task({**key, 'cutoff': cutoff}, train, periods=horizon, params=params))
+    return tasks
+
+
+def series_histories(merged_df=None, cube=None):
+    """The series the site reports on, as {name: (ds/y history, Prophet params)}."""
+    histories = {}
+    if merged_df is not None:
+        for series, column in PRICE_SERIES.items():
+            history = merged_df[['Date', column]].rename(columns={'Date': 'ds', column: 'y'}).dropna()
+            histories[series] = (history, BACKTEST_PARAMS)
+    if cube is not None:
+        monthly = ev_aggregates.summarize(cube, regions=['Pacific'])
+        history = monthly.rename(columns={'year_month': 'ds', 'energy_kwh': 'y'})[['ds', 'y']]
+        if len(history):
+            histories['pacific_energy'] = (history, None)
+    return histories
+
+
+def score_folds(table, histories):
+    """Joins fold forecasts with the actuals; one row per (series, cutoff, months ahead)."""
+    scored = []
+    for series, (history, _) in histories.items():
+        folds = table[(table['series'] == series) & (table['ds'] > table['cutoff'])]
+        if not len(folds):
+            continue
+        actual = history.set_index('ds')['y']
+        folds = folds.sort_values(['cutoff', 'ds']).assign(
+            actual=folds['ds'].map(actual).to_numpy(dtype=float),
+        )
+        folds['months_ahead'] = folds.groupby('cutoff').cumcount() + 1
+        scored.append(folds.dropna(subset=['actual']))
+    if not scored:
+        return pd.DataFrame(columns=['series', 'cutoff', 'months_ahead', 'ds', 'actual', 'yhat',
+                                     'yhat_lower', 'yhat_upper'])
+    return pd.concat(scored, ignore_index=True)
+
+
+def metrics(scored, by=('series', 'months_ahead')):
+    """MAE, MAPE (%) and the share of actuals inside the forecast interval, per `by` group."""
+    error = (scored['actual'] - scored['yhat']).abs()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = error / scored['actual'].abs() * 100
+    frame = scored.assign(
+        abs_error=error,
+        pct_error=pct.replace([np.inf, -np.inf], np.nan),
+        covered=((scored['actual'] >= scored['yhat_lower']) & (scored['actual'] <= scored['yhat_upper'])).astype(float),
+    )
+    return frame.groupby(list(by), sort=True).agg(
+        folds=('cutoff', 'nunique'),
+        mae=('abs_error', 'mean'),
+        mape=('pct_error', 'mean'),
+        coverage=('covered', 'mean'),
+    ).reset_index()
+
+
+def run_backtests(histories, horizon=DEFAULT_HORIZON, folds=DEFAULT_FOLDS, step=DEFAULT_STEP,
+                  min_train=MIN_TRAIN, workers=None, timeout=DEFAULT_TIMEOUT, cache=None):
+    """Fits every fold of every series in one process pool; returns (metrics, status)."""
+    tasks = []
+    for series, (history, params) in histories.items():
+        tasks += fold_tasks({'series': series}, history, horizon=horizon, params=params,
+                            folds=folds, step=step, min_train=min_train)
+    table, status = run_forecasts(tasks, workers=workers, timeout=timeout, cache=cache)
+    return metrics(score_folds(table, histories)), status
+
+
+def load_metrics(path=BACKTEST_PATH):
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def describe(table, series, value_format='{:.2f}', months_ahead=DEFAULT_HORIZON):
+    """One-sentence summary of a series' back-test for the pages, or None without results."""
+    if table is None:
+        return None
+    rows = table[table['series'] == series]
+    rows = rows[rows['months_ahead'] <= months_ahead]
+    if not len(rows):
+        return None
+    first, last = rows.iloc[0], rows.iloc[-1]
+    return (
+        f"Rolling back-test over {int(first['folds'])} forecast origins: "
+        f"MAE {value_format.format(first['mae'])} ({first['mape']:.1f}% MAPE) one month ahead, "
+        f"{value_format.format(last['mae'])} ({last['mape']:.1f}%) {int(last['months_ahead'])} months ahead; "
+        f"{last['coverage'] * 100:.0f}% of {int(last['months_ahead'])}-month-ahead actuals fell inside the forecast interval."
+    )
@@ -0,0 +1,192 @@
+"""Offline build step for the website's precomputed data.
+
+Run before `gcloud app deploy` so pages can load their data without touching GCS:
+
+    python build_artifacts.py evvsgas
+    python build_artifacts.py sessions --session-csv evwatts.public.session.csv --evse-csv evwatts.public.evse.csv
+
+`parquet` instead converts the raw CSVs in the bucket to Parquet next to them (see parquet_convert);
+`sessions --from-parquet` then reads the sessions from that dataset.
+"""
+import argparse
+import sys
+
+from gcs_cache import list_blob_names, prefetch_blobs
+import backtest
+import cpi
+import ev_aggregates
+import evvsgas_data
+import forecast_cache
+import forecasting
+import growth_models
+import metro_rankings
+import parquet_convert
+import price_panel
+import session_heatmap
+
+
+def _bundled_cpi():
+    """The bundled CPI series; the download is left to the separate `cpi` step."""
+    series = cpi.load_cpi()
+    if series is None:
+        print(f"WARNING: {cpi.CPI_PATH} is missing, so the artifact gets no CPI factors and the "
+              "inflation-adjusted toggles stay hidden. Run `python build_artifacts.py cpi`, "
+              "commit the file and rebuild evvsgas.", file=sys.stderr)
+    return series
+
+
+def build_evvsgas(args):
+    # Every "<Region> Electric Rates.csv" in the bucket is a region of the price panel
+    rates = {price_panel.DEFAULT_REGION: evvsgas_data.ELEC_BLOB,
+             **price_panel.rate_blobs(list_blob_names(args.bucket, price_panel.RATE_PREFIX))}
+    gas_df, *elec_dfs = prefetch_blobs(args.bucket, [(evvsgas_data.GAS_BLOB, 3)] + [(blob, 0) for blob in rates.values()])
+    elec_by_region = dict(zip(rates, elec_dfs))
+
+    cpi_series = _bundled_cpi()
+    merged_df, summary = evvsgas_data.build_merged(gas_df, elec_by_region[price_panel.DEFAULT_REGION], cpi_series)
+    evvsgas_data.write_artifact(merged_df, summary, args.out)
+    print(f"Wrote {len(merged_df)} months to {args.out}")
+
+    values, index = price_panel.build_panel(
+        evvsgas_data.clean_gas(gas_df),
+        {region: evvsgas_data.clean_elec(df) for region, df in elec_by_region.items()},
+        cpi_series, summary['cpi_base_year'],
+    )
+    price_panel.save_panel(values, index)
+    print(f"Wrote {index['months']} months x {len(index['series'])} price series to {price_panel.PANEL_PATH}")
+
+
+def build_sessions(args):
+    cube = ev_aggregates.update_cube(args.out, args.session_csv, args.evse_csv,
+                                     chunksize=args.chunksize, full=args.full, daily_path=args.daily_out,
+                                     bucket_name=args.bucket if args.from_parquet else None)
+    print(f"Session cube has {len(cube)} cells covering "
+          f"{cube['year_month'].min():%Y-%m} to {cube['year_month'].max():%Y-%m} in {args.out}")
+    session_heatmap.save_heatmap(*session_heatmap.build_heatmap(cube))
+    metro_rankings.update_rankings(args.out, full=args.full)
+    print(f"Daily rollup in {args.daily_out}, heatmap matrix in {session_heatmap.HEATMAP_PATH}, "
+          f"metro rankings in {metro_rankings.RANKINGS_PATH}")
+
+
+def build_growth(args):
+    cube = ev_aggregates.load_cube(args.cube)
+    if cube is None:
+        raise SystemExit(f"{args.cube} not found; run the sessions step first")
+    table = growth_models.metro_growth(cube)
+    table.to_parquet(args.out, index=False)
+    print(f"Fitted {len(table)} (region, metro, metric) series to {args.out}")
+
+
+def build_forecasts(args):
+    cache = None if args.no_cache else forecast_cache.ForecastCache()
+    options = dict(workers=args.workers, timeout=args.timeout, cache=cache, warm_start=args.warm_start)
+
+    merged_df, _ = evvsgas_data.load_artifact()
+    if merged_df is None:
+        raise SystemExit(f"{evvsgas_data.ARTIFACT_PATH} not found; run the evvsgas step first")
+    table, status = forecasting.price_forecasts(merged_df, **options)
+    table.to_parquet(args.price_out, index=False)
+    print(f"Forecast {len(status)} price series ({status['status'].value_counts().to_dict()}) to {args.price_out}")
+
+    cube = ev_aggregates.load_cube(args.cube)
+    if cube is None:
+        print(f"Skipping session forecasts: {args.cube} not found (run the sessions step first)")
+        return
+    tasks = forecasting.cube_tasks(cube, regions=args.region or None, min_months=args.min_months,
+                                   periods=args.periods)
+    table, status = forecasting.run_forecasts(tasks, **options)
+    table.to_parquet(args.out, index=False)
+    print(f"Forecast {len(tasks)} series ({status['status'].value_counts().to_dict()}) to {args.out}")
+
+
+def build_backtest(args):
+    merged_df, _ = evvsgas_data.load_artifact()
+    if merged_df is None:
+        raise SystemExit(f"{evvsgas_data.ARTIFACT_PATH} not found; run the evvsgas step first")
+    histories = backtest.series_histories(merged_df, ev_aggregates.load_cube(args.cube))
+    cache = None if args.no_cache else forecast_cache.ForecastCache()
+    table, status = backtest.run_backtests(histories, horizon=args.horizon, folds=args.folds, step=args.step,
+                                           workers=args.workers, timeout=args.timeout, cache=cache)
+    table.to_parquet(args.out, index=False)
+    print(f"Back-tested {', '.join(histories)} over {len(status)} folds "
+          f"({status['status'].value_counts().to_dict()}) to {args.out}")
+
+
+def build_cpi(args):
+    months = cpi.refresh_cpi(args.out)
+    print(f"Wrote {months} months of {cpi.CPI_SERIES} to {args.out}; commit it and rebuild evvsgas")
+
+
+def build_parquet(args):
+    gas_rows, elec_rows = parquet_convert.convert_prices(args.bucket)
+    print(f"Converted {gas_rows} gas and {elec_rows} electric price rows")
+    if not args.skip_sessions:
+        rows = parquet_convert.convert_sessions(args.bucket, chunksize=args.chunksize)
+        print(f"Converted {rows} sessions to gs://{args.bucket}/{parquet_convert.SESSIONS_PARQUET}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bucket", default=evvsgas_data.BUCKET_NAME)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evvsgas = commands.add_parser("evvsgas", help="merged gas/electric prices and summary statistics")
+    evvsgas.add_argument("--out", default=evvsgas_data.ARTIFACT_PATH)
+    evvsgas.set_defaults(func=build_evvsgas)
+
+    sessions = commands.add_parser("sessions", help="monthly session/energy cube and daily rollup (incremental)")
+    sessions.add_argument("--session-csv", default=ev_aggregates.SESSION_FILE)
+    sessions.add_argument("--evse-csv", default=ev_aggregates.EVSE_FILE)
+    sessions.add_argument("--chunksize", type=int, default=ev_aggregates.DEFAULT_CHUNKSIZE)
+    sessions.add_argument("--full", action="store_true", help="rebuild instead of appending new months")
+    sessions.add_argument("--from-parquet", action="store_true",
+                          help="read the bucket's converted sessions (see the parquet step) instead of the CSVs")
+    sessions.add_argument("--out", default=ev_aggregates.CUBE_PATH)
+    sessions.add_argument("--daily-out", default=ev_aggregates.DAILY_PATH)
+    sessions.set_defaults(func=build_sessions)
+
+    growth = commands.add_parser("growth", help="linear vs exponential growth fits for every metro")
+    growth.add_argument("--cube", default=ev_aggregates.CUBE_PATH)
+    growth.add_argument("--out", default=growth_models.GROWTH_PATH)
+    growth.set_defaults(func=build_growth)
+
+    forecasts = commands.add_parser("forecasts", help="Prophet forecasts for the prices and every region/metro/metric")
+    forecasts.add_argument("--cube", default=ev_aggregates.CUBE_PATH)
+    forecasts.add_argument("--region", action="append", help="limit to a region (repeatable)")
+    forecasts.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    forecasts.add_argument("--timeout", type=float, default=forecasting.DEFAULT_TIMEOUT, help="seconds per series")
+    forecasts.add_argument("--periods", type=int, default=forecasting.DEFAULT_PERIODS, help="months to forecast")
+    forecasts.add_argument("--min-months", type=int, default=forecasting.MIN_MONTHS)
+    forecasts.add_argument("--no-cache", action="store_true", help="refit every series instead of reusing unchanged fits")
+    forecasts.add_argument("--warm-start", action="store_true",
+                           help="initialise fits from each series' previous parameters when only a few months were added")
+    forecasts.add_argument("--out", default=forecasting.FORECAST_PATH)
+    forecasts.add_argument("--price-out", default=forecasting.PRICE_FORECAST_PATH)
+    forecasts.set_defaults(func=build_forecasts)
+
+    backtests = commands.add_parser("backtest", help="rolling-origin back-tests of the forecasts (nightly)")
+    backtests.add_argument("--cube", default=ev_aggregates.CUBE_PATH)
+    backtests.add_argument("--folds", type=int, default=backtest.DEFAULT_FOLDS, help="rolling origins per series")
+    backtests.add_argument("--step", type=int, default=backtest.DEFAULT_STEP, help="months between origins")
+    backtests.add_argument("--horizon", type=int, default=backtest.DEFAULT_HORIZON, help="months scored after each origin")
+    backtests.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    backtests.add_argument("--timeout", type=float, default=forecasting.DEFAULT_TIMEOUT, help="seconds per fold")
+    backtests.add_argument("--no-cache", action="store_true", help="refit every fold")
+    backtests.add_argument("--out", default=backtest.BACKTEST_PATH)
+    backtests.set_defaults(func=build_backtest)
+
+    cpi_parser = commands.add_parser("cpi", help="refresh the bundled CPI series from FRED")
+    cpi_parser.add_argument("--out", default=cpi.CPI_PATH)
+    cpi_parser.set_defaults(func=build_cpi)
+
+    parquet = commands.add_parser("parquet", help="convert the raw CSVs in the bucket to typed Parquet")
+    parquet.add_argument("--chunksize", type=int, default=ev_aggregates.DEFAULT_CHUNKSIZE)
+    parquet.add_argument("--skip-sessions", action="store_true", help="only convert the price series")
+    parquet.set_defaults(func=build_parquet)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
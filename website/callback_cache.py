@@ -0,0 +1,176 @@
+"""Memoization for the server-side Dash callbacks (see memoize).
+
+The EVvsGas slider cache only comes into play when the page's clientside mode is off:
+app.yaml sets EVVSGAS_CLIENTSIDE=1, which moves the cost-per-mile sliders into the browser,
+so in production it mainly serves the simulation and rolling-statistics callbacks. Hit/miss
+counters are served at /_cache/stats when CACHE_STATS_ROUTE=1.
+"""
+import functools
+import hashlib
+import logging
+import numbers
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Shared by every gunicorn worker on the instance (on App Engine /tmp is held in memory)
+CACHE_DIR = os.environ.get("CALLBACK_CACHE_DIR", "/tmp/callback_cache")
+
+_caches = {}
+
+
+class CallbackCache:
+    """LRU cache with size and TTL eviction, optionally backed by a directory shared across processes."""
+
+    def __init__(self, name, maxsize=1024, ttl=None, shared=False, version=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = version
+        self.disk_dir = os.path.join(CACHE_DIR, name) if shared else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr((self.version, key)).encode()).hexdigest()
+        return os.path.join(self.disk_dir, digest + ".pkl")
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                return False, None, None
+            with open(path, "rb") as f:
+                return True, stored_at, pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False, None, None
+
+    def _write_disk(self, key, value):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError):
+            logger.warning("Could not write %s cache entry", self.name, exc_info=True)
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        # Cheap check first; only list the directory when it has clearly outgrown maxsize
+        try:
+            names = os.listdir(self.disk_dir)
+        except OSError:
+            return
+        if len(names) <= self.maxsize * 1.25:
+            return
+        paths = [os.path.join(self.disk_dir, n) for n in names if n.endswith(".pkl")]
+        paths.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+        for path in paths[:len(paths) - self.maxsize]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, key):
+        """Returns (found, value)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+
+        if self.disk_dir:
+            found, stored_at, value = self._read_disk(key)
+            if found:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, value, stored_at)
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def _store(self, key, value, stored_at):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value, time.time())
+        if self.disk_dir:
+            self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else None,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "shared": self.disk_dir is not None,
+            }
+
+
+def _cache_key(args):
+    # Slider values arrive as 25 or 25.0 depending on the step; one disk entry for both
+    return tuple(float(a) if isinstance(a, numbers.Real) and not isinstance(a, bool) else a for a in args)
+
+
+def memoize(name=None, maxsize=1024, ttl=None, shared=False, version=None):
+    """Caches a function on its (hashable) positional arguments, with numbers compared as floats.
+
+    Set `shared` to also keep results on disk so every worker process benefits from a
+    hit, and pass a `version` tied to the underlying data so stale entries are never served.
+    """
+    def decorator(func):
+        cache = CallbackCache(name or func.__qualname__, maxsize=maxsize, ttl=ttl,
+                              shared=shared, version=version)
+        _caches[cache.name] = cache
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = _cache_key(args)
+            found, value = cache.get(key)
+            if found:
+                return value
+            value = func(*args)
+            cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Hit/miss counters for every memoized function in this process."""
+    return {name: cache.stats() for name, cache in _caches.items()}
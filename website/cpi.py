@@ -0,0 +1,69 @@
+"""Consumer price index used for the inflation-adjusted (constant dollar) views.
+
+The site never calls FRED while serving: CPIAUCSL (all urban consumers, seasonally adjusted,
+monthly) is read from the bundled `data/CPIAUCSL.csv`, which is refreshed separately with
+
+    python build_artifacts.py cpi
+
+and committed. FRED's public CSV download needs no API key.
+"""
+import io
+import logging
+import os
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CPI_SERIES = "CPIAUCSL"
+CPI_URL = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={CPI_SERIES}"
+CPI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", f"{CPI_SERIES}.csv")
+
+
+def _parse(text):
+    df = pd.read_csv(io.StringIO(text) if isinstance(text, str) else text)
+    # FRED has used both DATE and observation_date for the first column
+    df = df.rename(columns={df.columns[0]: 'date', CPI_SERIES: 'cpi'})
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df['cpi'] = pd.to_numeric(df['cpi'], errors='coerce')
+    return df.dropna()[['date', 'cpi']]
+
+
+def refresh_cpi(path=CPI_PATH, url=CPI_URL, timeout=30):
+    """Downloads the CPI series to `path`; returns the number of months written."""
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        df = _parse(response.read().decode())
+    if not len(df):
+        raise ValueError(f"No {CPI_SERIES} observations in the download from {url}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.rename(columns={'cpi': CPI_SERIES}).to_csv(tmp_path, index=False, date_format='%Y-%m-%d')
+    os.replace(tmp_path, path)
+    return len(df)
+
+
+def load_cpi(path=CPI_PATH):
+    """The bundled CPI as a Series indexed by month start, or None if it isn't there."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        df = _parse(f)
+    return df.set_index(df['date'].dt.to_period('M').dt.to_timestamp())['cpi']
+
+
+def cpi_factors(dates, cpi, base_year=None):
+    """Per-month multipliers converting nominal prices on `dates` to `base_year` dollars.
+
+    `base_year` defaults to the last year in `dates` (the notebook used the 2024 average).
+    Months past the end of the CPI series carry its last value forward. Returns
+    (factors as a float array, base_year).
+    """
+    months = pd.DatetimeIndex(pd.to_datetime(dates)).to_period('M').to_timestamp()
+    base_year = int(base_year or months.max().year)
+    base = cpi[cpi.index.year == base_year].mean()
+    if np.isnan(base):
+        base = cpi.iloc[-1]
+    monthly = cpi.reindex(cpi.index.union(months)).ffill().bfill()
+    return (base / monthly.reindex(months)).to_numpy(dtype=float), base_year
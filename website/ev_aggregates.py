@@ -0,0 +1,205 @@
+"""Monthly aggregate store for the EVWatts sessions.
+
+One row per (year_month, region, metro_area, charge_level) holding the session count, the
+energy sum and sum of squares, and a fixed log-spaced histogram of energy per session (a
+mergeable sketch for medians). Growth analyses, heatmaps and Prophet inputs read this cube
+instead of scanning the multi-million-row session table. The same pass also keeps a daily
+(date, region, metro_area) rollup of sessions and energy for the findings page's charts.
+
+    python build_artifacts.py sessions --session-csv evwatts.public.session.csv \\
+        --evse-csv evwatts.public.evse.csv
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import parquet_convert
+from ev_ingest import DEFAULT_CHUNKSIZE, EVSE_FILE, SESSION_FILE, iter_sessions
+from evvsgas_data import ARTIFACT_DIR
+
+CUBE_PATH = os.path.join(ARTIFACT_DIR, "session_cube.parquet")
+DAILY_PATH = os.path.join(ARTIFACT_DIR, "session_daily.parquet")
+
+KEYS = ['year_month', 'region', 'metro_area', 'charge_level']
+DAILY_KEYS = ['date', 'region', 'metro_area']
+
+# Bin i holds energies in [HIST_EDGES[i], HIST_EDGES[i + 1]); the last bin is open-ended
+HIST_EDGES = np.concatenate([[0.0], np.geomspace(0.1, 500.0, 48)])
+
+
+def _energy_bins(energy):
+    energy = np.nan_to_num(np.clip(energy, 0.0, None), nan=-1.0)
+    bins = np.searchsorted(HIST_EDGES, energy, side='right') - 1
+    # Missing energy is counted as a session but left out of the sketch
+    return np.where(energy < 0, -1, bins)
+
+
+def aggregate_chunk(chunk):
+    """Aggregates one session chunk to long (cube keys + histogram bin) partial sums."""
+    energy = chunk['energy_kwh'].to_numpy(dtype=float)
+    partial = chunk[KEYS].assign(
+        sessions=1,
+        energy_kwh=np.nan_to_num(energy),
+        energy_sq=np.nan_to_num(energy) ** 2,
+        bin=_energy_bins(energy),
+    )
+    return partial.groupby(KEYS + ['bin'], observed=True, dropna=False, sort=False).sum().reset_index()
+
+
+def aggregate_daily(chunk):
+    """Sessions and energy per (date, region, metro_area) of one session chunk."""
+    day = chunk['start_datetime'].to_numpy().astype('datetime64[D]').astype('datetime64[ns]')
+    partial = chunk[DAILY_KEYS[1:]].assign(
+        date=day,
+        sessions=1,
+        energy_kwh=np.nan_to_num(chunk['energy_kwh'].to_numpy(dtype=float)),
+    )
+    return (partial.groupby(DAILY_KEYS, observed=True, dropna=False, sort=False)[['sessions', 'energy_kwh']]
+            .sum().reset_index())
+
+
+def _combine(partials):
+    """Folds partial sums into the cube, turning the bin rows into one histogram per cell."""
+    long = pd.concat(partials, ignore_index=True)
+    long = long.groupby(KEYS + ['bin'], observed=True, dropna=False).sum().reset_index()
+
+    cube = long.groupby(KEYS, observed=True, dropna=False)[['sessions', 'energy_kwh', 'energy_sq']].sum()
+    hist = np.zeros((len(cube), len(HIST_EDGES)), dtype=np.int64)
+    cell = cube.index.get_indexer(pd.MultiIndex.from_frame(long[KEYS]))
+    binned = long['bin'].to_numpy() >= 0
+    np.add.at(hist, (cell[binned], long['bin'].to_numpy()[binned]), long['sessions'].to_numpy()[binned])
+
+    cube = cube.reset_index()
+    cube['energy_hist'] = list(hist)
+    return cube
+
+
+def build_cube(chunks):
+    """Builds the cube from an iterable of session chunks (see ev_ingest.iter_sessions)."""
+    partials = [aggregate_chunk(chunk) for chunk in chunks]
+    if not partials:
+        return pd.DataFrame(columns=KEYS + ['sessions', 'energy_kwh', 'energy_sq', 'energy_hist'])
+    return _combine(partials)
+
+
+def build_daily(partials):
+    """Folds aggregate_daily() partials into the daily rollup."""
+    if not partials:
+        return pd.DataFrame(columns=DAILY_KEYS + ['sessions', 'energy_kwh'])
+    long = pd.concat(partials, ignore_index=True).astype({c: object for c in DAILY_KEYS[1:]})
+    return long.groupby(DAILY_KEYS, dropna=False)[['sessions', 'energy_kwh']].sum().reset_index()
+
+
+def load_cube(path=CUBE_PATH, keys=KEYS):
+    if not os.path.exists(path):
+        return None
+    cube = pd.read_parquet(path)
+    for column in keys[1:]:
+        cube[column] = cube[column].astype('category')
+    return cube
+
+
+def load_daily(path=DAILY_PATH):
+    return load_cube(path, DAILY_KEYS)
+
+
+def save_cube(cube, path=CUBE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    cube.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _append(stored, fresh, keys, since):
+    """Stored rows before `since` followed by the freshly aggregated ones, sorted by `keys`."""
+    if since is not None:
+        kept = stored[stored[keys[0]] < since]
+        fresh = pd.concat([kept.astype({c: object for c in keys[1:]}),
+                           fresh.astype({c: object for c in keys[1:]})], ignore_index=True)
+    return fresh.sort_values(keys, ignore_index=True)
+
+
+def update_cube(path=CUBE_PATH, session_path=SESSION_FILE, evse_path=EVSE_FILE,
+                chunksize=DEFAULT_CHUNKSIZE, full=False, daily_path=DAILY_PATH, bucket_name=None):
+    """Brings the stored cube and daily rollup up to date with the session table; returns the cube.
+
+    Only sessions from the latest stored month onwards are aggregated (that month is
+    recomputed since it may have been partial); older months are kept as stored.
+    `full` rebuilds everything, as does a missing daily rollup. With `bucket_name` the
+    sessions are read from that bucket's converted Parquet dataset (see parquet_convert)
+    instead of the CSVs.
+    """
+    full = full or not os.path.exists(daily_path)
+    cube = None if full else load_cube(path)
+    daily = None if full else load_daily(daily_path)
+    since = cube['year_month'].max() if cube is not None and len(cube) else None
+
+    columns = KEYS + ['start_datetime', 'energy_kwh']
+    if bucket_name:
+        # Only these columns, and the partitions from `since` on, are read
+        sessions = parquet_convert.read_sessions(bucket_name, columns, since=since)
+        chunks = [sessions] if len(sessions) else []
+    else:
+        chunks = iter_sessions(session_path, evse_path, columns=columns, since=since, chunksize=chunksize)
+
+    partials, daily_partials = [], []
+    for chunk in chunks:
+        partials.append(aggregate_chunk(chunk))
+        daily_partials.append(aggregate_daily(chunk))
+    fresh = _combine(partials) if partials else build_cube([])
+
+    save_cube(_append(daily, build_daily(daily_partials), DAILY_KEYS, since), daily_path)
+    save_cube(_append(cube, fresh, KEYS, since), path)
+    return load_cube(path)
+
+
+def _median_from_hist(hist):
+    """Approximate median per row of a histogram matrix, interpolating inside the bin."""
+    totals = hist.sum(axis=1)
+    cumulative = hist.cumsum(axis=1)
+    half = totals / 2.0
+    bins = (cumulative < half[:, None]).sum(axis=1).clip(max=hist.shape[1] - 1)
+    rows = np.arange(len(hist))
+    before = np.where(bins > 0, cumulative[rows, np.maximum(bins - 1, 0)], 0)
+    in_bin = hist[rows, bins]
+    frac = np.divide(half - before, in_bin, out=np.full(len(hist), 0.5), where=in_bin > 0)
+
+    lower = HIST_EDGES[bins]
+    upper = np.append(HIST_EDGES[1:], HIST_EDGES[-1] * 2)[bins]
+    median = lower + frac * (upper - lower)
+    return np.where(totals > 0, median, np.nan)
+
+
+def summarize(cube, by=('year_month',), regions=None, metros=None, charge_levels=None):
+    """Rolls the cube up to the `by` columns, optionally filtered.
+
+    Returns sessions, energy_kwh (sum), energy_mean, energy_std and energy_median per group,
+    e.g. summarize(cube, regions=['Pacific']) is the notebooks' monthly Pacific series.
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    if regions is not None:
+        mask &= cube['region'].isin(regions).to_numpy()
+    if metros is not None:
+        mask &= cube['metro_area'].isin(metros).to_numpy()
+    if charge_levels is not None:
+        mask &= cube['charge_level'].isin(charge_levels).to_numpy()
+    by = list(by)
+    # The cube keeps sessions with an unknown region/metro as NaN keys; groupby drops those
+    # groups, so drop their rows too or ngroup() (used for the histograms) holds NaN
+    mask &= cube[by].notna().all(axis=1).to_numpy()
+    cube = cube[mask]
+
+    grouped = cube.groupby(by, observed=True, sort=True)
+    out = grouped[['sessions', 'energy_kwh', 'energy_sq']].sum()
+    hist = np.zeros((len(out), len(HIST_EDGES)), dtype=np.int64)
+    if len(cube):
+        np.add.at(hist, grouped.ngroup().to_numpy(), np.stack(cube['energy_hist'].to_numpy()))
+
+    n = out['sessions'].to_numpy(dtype=float)
+    mean = out['energy_kwh'].to_numpy() / n
+    var = np.maximum(out['energy_sq'].to_numpy() / n - mean ** 2, 0) * n / np.maximum(n - 1, 1)
+    out['energy_mean'] = mean
+    out['energy_std'] = np.sqrt(var)
+    out['energy_median'] = _median_from_hist(hist)
+    return out.drop(columns='energy_sq').reset_index()
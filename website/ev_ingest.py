@@ -0,0 +1,106 @@
+"""Streaming reader for the EVWatts session and EVSE tables.
+
+Replaces the notebooks' full `pd.read_csv` + `pd.merge` of the session table: the session CSV
+is read in chunks with explicit dtypes, each chunk picks up the EVSE attributes through a hash
+lookup on evse_id, and only the requested columns are kept, so peak memory is one chunk plus
+the (small) output.
+
+    from ev_ingest import read_sessions
+    session_data = read_sessions('evwatts.public.session.csv', 'evwatts.public.evse.csv',
+                                 regions=['Pacific'])
+"""
+import numpy as np
+import pandas as pd
+
+SESSION_FILE = 'evwatts.public.session.csv'
+EVSE_FILE = 'evwatts.public.evse.csv'
+
+SESSION_DTYPES = {
+    'session_id': 'int64',
+    'evse_id': 'int64',
+    'energy_kwh': 'float64',
+}
+EVSE_DTYPES = {
+    'evse_id': 'int64',
+    'charge_level': 'category',
+    'region': 'category',
+    'metro_area': 'category',
+}
+EVSE_ATTRIBUTES = ['charge_level', 'region', 'metro_area']
+
+DEFAULT_COLUMNS = ['session_id', 'start_datetime', 'year_month', 'energy_kwh'] + EVSE_ATTRIBUTES
+DEFAULT_CHUNKSIZE = 500_000
+
+
+class EvseLookup:
+    """EVSE attributes keyed by evse_id, stored as categorical codes for cheap per-chunk joins."""
+
+    def __init__(self, evse_df):
+        evse_df = evse_df.drop_duplicates('evse_id')
+        self.index = pd.Index(evse_df['evse_id'].to_numpy())
+        self.codes = {}
+        self.categories = {}
+        for column in EVSE_ATTRIBUTES:
+            values = evse_df[column].astype('category')
+            # An extra trailing -1 gives sessions with an unknown evse_id a missing value
+            self.codes[column] = np.append(values.cat.codes.to_numpy(), -1)
+            self.categories[column] = values.cat.categories
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path, usecols=list(EVSE_DTYPES), dtype=EVSE_DTYPES))
+
+    def attach(self, chunk, columns=EVSE_ATTRIBUTES):
+        """Adds the EVSE attribute columns to a session chunk (a left join on evse_id)."""
+        positions = self.index.get_indexer(chunk['evse_id'].to_numpy())
+        for column in columns:
+            codes = self.codes[column][positions]
+            chunk[column] = pd.Categorical.from_codes(codes, self.categories[column])
+        return chunk
+
+
+def iter_sessions(session_path=SESSION_FILE, evse_path=EVSE_FILE, columns=DEFAULT_COLUMNS,
+                  regions=None, since=None, chunksize=DEFAULT_CHUNKSIZE, evse=None):
+    """Yields session chunks joined with their EVSE attributes.
+
+    `regions` keeps only sessions in those regions and `since` only sessions whose
+    year_month is on or after that month. `year_month` (start of the session's month,
+    as in the notebooks) is derived from start_datetime whenever it is requested or
+    `since` is given.
+    """
+    evse = evse if evse is not None else EvseLookup.from_csv(evse_path)
+    columns = list(columns)
+    evse_columns = [c for c in EVSE_ATTRIBUTES if c in columns or (c == 'region' and regions)]
+    need_month = 'year_month' in columns or since is not None
+    need_start = need_month or 'start_datetime' in columns
+
+    usecols = [c for c in columns if c in SESSION_DTYPES or c.endswith('_datetime')]
+    usecols = list(dict.fromkeys(['evse_id'] + usecols + (['start_datetime'] if need_start else [])))
+    dtypes = {c: t for c, t in SESSION_DTYPES.items() if c in usecols}
+    since = pd.Timestamp(since).to_period('M').to_timestamp() if since is not None else None
+
+    for chunk in pd.read_csv(session_path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        evse.attach(chunk, evse_columns)
+        if regions:
+            chunk = chunk[chunk['region'].isin(regions)]
+
+        if need_start:
+            chunk = chunk.assign(start_datetime=pd.to_datetime(chunk['start_datetime'], cache=True))
+        if need_month:
+            month = chunk['start_datetime'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]')
+            chunk = chunk.assign(year_month=month)
+            if since is not None:
+                chunk = chunk[chunk['year_month'] >= since]
+
+        if len(chunk):
+            yield chunk[columns].reset_index(drop=True)
+
+
+def read_sessions(session_path=SESSION_FILE, evse_path=EVSE_FILE, columns=DEFAULT_COLUMNS,
+                  regions=None, since=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Reads the joined session table in chunks and returns only the requested columns."""
+    chunks = list(iter_sessions(session_path, evse_path, columns, regions, since, chunksize))
+    if not chunks:
+        return pd.DataFrame(columns=list(columns))
+    # Every chunk shares the EVSE categories, so the concatenation stays categorical
+    return pd.concat(chunks, ignore_index=True)
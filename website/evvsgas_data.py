@@ -0,0 +1,152 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from correlation_stats import bootstrap_corr
+from cpi import cpi_factors, load_cpi
+
+# Constants for default efficiencies
+DEFAULT_GAS_MPG = 25
+DEFAULT_EV_MI_PER_KWH = 4
+
+# The project bucket, unless BUCKET_NAME names another one
+BUCKET_NAME = os.environ.get("BUCKET_NAME", "evenergy163.appspot.com")
+GAS_BLOB = 'data/Monthly Gas Prices.csv'
+ELEC_BLOB = 'data/California Electric Rates.csv'
+
+# Bump whenever the columns or summary keys below change, so stale files are ignored
+ARTIFACT_VERSION = 3
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"))
+ARTIFACT_PATH = os.path.join(ARTIFACT_DIR, "evvsgas.arrow")
+
+
+def clean_gas(gas_df, years=(2000, 2024)):
+    """Normalizes the raw gas price sheet (read with header=3) to Date / Gas Price / YearMonth.
+
+    Rows outside `years` (inclusive) are dropped; pass None to keep them all.
+    """
+    gas_df = gas_df.copy()
+    gas_df.columns = gas_df.columns.str.strip()
+    gas_df = gas_df.rename(columns={gas_df.columns[0]: 'Date', gas_df.columns[1]: 'Gas Price'})
+    gas_df = gas_df[gas_df['Date'] != 'Date'].reset_index(drop=True)
+    gas_df['Gas Price'] = pd.to_numeric(gas_df['Gas Price'], errors='coerce')
+    gas_df['Date'] = pd.to_datetime(gas_df['Date'], format='%b-%Y', errors='coerce')
+    gas_df = gas_df.dropna(subset=['Date'])
+    if years:
+        gas_df = gas_df[(gas_df['Date'].dt.year >= years[0]) & (gas_df['Date'].dt.year <= years[1])]
+    gas_df['YearMonth'] = gas_df['Date'].dt.to_period('M')
+    return gas_df
+
+
+def clean_elec(elec_df, years=(2000, 2024)):
+    """Normalizes the raw electric rate sheet to Date / Electric Rate / YearMonth."""
+    elec_df = elec_df.copy()
+    elec_df.columns = elec_df.columns.str.strip()
+    if "Value (USD/kWh)" in elec_df.columns:
+        elec_df = elec_df.rename(columns={"Value (USD/kWh)": "Electric Rate"})
+    elec_df['Date'] = pd.to_datetime(elec_df['Date'], errors='coerce')
+    elec_df = elec_df.dropna(subset=['Date'])
+    if years:
+        elec_df = elec_df[(elec_df['Date'].dt.year >= years[0]) & (elec_df['Date'].dt.year <= years[1])]
+    elec_df['YearMonth'] = elec_df['Date'].dt.to_period('M')
+    return elec_df
+
+
+def build_merged(gas_df, elec_df, cpi=None):
+    """Runs the EVvsGas pipeline on the raw sheets, returning (merged_df, summary).
+
+    With CPI data (the bundled file unless `cpi` is given) merged_df also gets a
+    'CPI Factor' column converting each month's prices to the latest year's dollars.
+    """
+    gas_df = clean_gas(gas_df)
+    elec_df = clean_elec(elec_df)
+
+    # Merge Datasets on YearMonth
+    merged_df = pd.merge(
+        gas_df[['YearMonth', 'Gas Price', 'Date']],
+        elec_df[['YearMonth', 'Electric Rate']],
+        on='YearMonth'
+    )
+
+    # Analysis Calculations
+    corr = merged_df['Gas Price'].corr(merged_df['Electric Rate'])
+    merged_df['Gas Rate Change (%)'] = merged_df['Gas Price'].pct_change() * 100
+    merged_df['Electric Rate Change (%)'] = merged_df['Electric Rate'].pct_change() * 100
+    mean_gas_change = merged_df['Gas Rate Change (%)'].mean()
+    mean_elec_change = merged_df['Electric Rate Change (%)'].mean()
+    corr_rate = merged_df['Gas Rate Change (%)'].corr(merged_df['Electric Rate Change (%)'])
+    merged_df['Gas Cost per Mile'] = merged_df['Gas Price'] / DEFAULT_GAS_MPG
+    merged_df['EV Cost per Mile'] = merged_df['Electric Rate'] / DEFAULT_EV_MI_PER_KWH
+
+    cpi = load_cpi() if cpi is None else cpi
+    cpi_base_year = None
+    if cpi is not None and len(cpi):
+        merged_df['CPI Factor'], cpi_base_year = cpi_factors(merged_df['Date'], cpi)
+
+    summary = {
+        'corr': float(corr),
+        'corr_rate': float(corr_rate),
+        'mean_gas_change': float(mean_gas_change),
+        'mean_elec_change': float(mean_elec_change),
+        # Block-bootstrap intervals and p-values backing the page's claims about both correlations
+        'corr_stats': bootstrap_corr(merged_df['Gas Price'], merged_df['Electric Rate']),
+        'corr_rate_stats': bootstrap_corr(merged_df['Gas Rate Change (%)'], merged_df['Electric Rate Change (%)']),
+        'cpi_base_year': cpi_base_year,
+    }
+    return merged_df, summary
+
+
+def write_artifact(merged_df, summary, path=ARTIFACT_PATH):
+    """Writes merged_df and the summary scalars to an uncompressed Arrow IPC file."""
+    # Period columns have no Arrow type; YearMonth is rebuilt from Date on load
+    table = pa.Table.from_pandas(merged_df.drop(columns=['YearMonth']), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'evvsgas_version'] = str(ARTIFACT_VERSION).encode()
+    metadata[b'evvsgas_summary'] = json.dumps(summary).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path=ARTIFACT_PATH):
+    """Memory-maps the artifact, returning (merged_df, summary) or (None, None) if unusable."""
+    if not os.path.exists(path):
+        return None, None
+    # The returned buffers keep the mapping alive, so the file is never read eagerly
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    metadata = table.schema.metadata or {}
+    if metadata.get(b'evvsgas_version') != str(ARTIFACT_VERSION).encode():
+        return None, None
+
+    merged_df = table.to_pandas(split_blocks=True)
+    merged_df['YearMonth'] = merged_df['Date'].dt.to_period('M')
+    summary = json.loads(metadata[b'evvsgas_summary'])
+    return merged_df, summary
+
+
+def save_array(values, index, path, index_path):
+    """Writes a dense array as .npy plus its JSON index, each replaced atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'wb') as f:
+        np.save(f, values)
+    with open(f"{index_path}.tmp", 'w') as f:
+        json.dump(index, f)
+    os.replace(f"{path}.tmp", path)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def load_array(path, index_path):
+    """(memory-mapped array, index) written by save_array, or None if either file is missing."""
+    if not (os.path.exists(path) and os.path.exists(index_path)):
+        return None
+    with open(index_path) as f:
+        index = json.load(f)
+    return np.load(path, mmap_mode='r'), index
@@ -0,0 +1,689 @@
+import hashlib
+from dash import html, dcc
+import plotly.graph_objects as go
+import numpy as np
+
+import dash
+from gcs_cache import prefetch_blobs
+from callback_cache import memoize
+from figure_cache import register_figure
+from evvsgas_data import (
+    BUCKET_NAME, DEFAULT_EV_MI_PER_KWH, DEFAULT_GAS_MPG, ELEC_BLOB, GAS_BLOB, build_merged, load_artifact,
+)
+from backtest import describe as describe_backtest, load_metrics as load_backtest_metrics
+from forecast_charts import backtest_figure, comparison_figure, forecast_figure
+from forecasting import BACKTEST_START, PRICE_FORECAST_PATH, load_forecasts
+from price_analytics import cross_correlation, rolling_corr, rolling_std
+from price_panel import DEFAULT_REGION, PricePanel
+from tco_simulation import CHARGING_LOSS_RANGE, DEFAULT_SCENARIOS, PERCENTILES, price_outlook, simulate
+
+from pages.EVvsGas import CLIENTSIDE_SLIDERS, PRESERIALIZED_FIGURES
+
+# Content of the /EVvsGas page. pages/EVvsGas.py imports this module on the first visit to
+# the route (or from the background warm-up), so the work below never delays app startup.
+
+# Prefer the artifact written by `python build_artifacts.py evvsgas`; it is memory-mapped,
+# so workers skip the download and processing entirely
+merged_df, summary = load_artifact()
+if merged_df is None:
+    # No (current) artifact deployed: load Data from GCS (both files in parallel) and process here
+    gas_df, elec_df = prefetch_blobs(BUCKET_NAME, [(GAS_BLOB, 3), (ELEC_BLOB, 0)])
+    merged_df, summary = build_merged(gas_df, elec_df)
+
+corr = summary['corr']
+corr_rate = summary['corr_rate']
+corr_stats = summary['corr_stats']
+corr_rate_stats = summary['corr_rate_stats']
+mean_gas_change = summary['mean_gas_change']
+mean_elec_change = summary['mean_elec_change']
+
+def format_p(stats):
+    """p-value text; with no null resample as extreme as observed, only a bound can be given."""
+    if stats['p_value'] <= 1 / (stats['resamples'] + 1):
+        return f"p < {1 / stats['resamples']:.4g}"
+    return f"p = {stats['p_value']:.3g}"
+
+def format_ci(stats, low='ci_low', high='ci_high', digits=2):
+    return f"{stats['confidence']:.0%} CI {stats[low]:.{digits}f} to {stats[high]:.{digits}f}"
+
+def strength(r):
+    r = abs(r)
+    return 'strong' if r >= 0.7 else 'moderate' if r >= 0.4 else 'weak' if r >= 0.2 else 'very weak'
+
+def significance(stats):
+    if stats['ci_low'] <= 0 <= stats['ci_high']:
+        return "its confidence interval includes zero, so it is indistinguishable from no relationship"
+    return "small, but its confidence interval excludes zero"
+
+# Create Plotly Figures
+corr_fig = go.Figure(data=[
+    go.Scatter(x=merged_df['Electric Rate'], y=merged_df['Gas Price'], mode='markers', name='Data Points')
+])
+corr_fig.update_layout(
+    title="Correlation: Gas Price vs Electric Rate",
+    xaxis=dict(title="Electric Rate ($/kWh)", showgrid=True, gridcolor='lightgrey', rangeslider=dict(visible=True)),
+    yaxis=dict(title="Gas Price ($/Gallon)", showgrid=True, gridcolor='lightgrey'),
+    template='plotly_white'
+)
+
+roc_fig = go.Figure(data=[
+    go.Scatter(x=merged_df['Date'], y=merged_df['Gas Rate Change (%)'], mode='lines', name='Gas Rate Change (%)', line=dict(color='red')),
+    go.Scatter(x=merged_df['Date'], y=merged_df['Electric Rate Change (%)'], mode='lines', name='Electric Rate Change (%)', line=dict(color='blue'))
+])
+roc_fig.update_layout(
+    title="Monthly Percentage Change in Gas and Electric Prices",
+    xaxis=dict(showgrid=True, gridcolor='lightgrey'),
+    yaxis=dict(showgrid=True, gridcolor='lightgrey'),
+    template='plotly_white',
+    updatemenus=[dict(
+        type='buttons', direction='right', x=1.05, y=1.15, showactive=True,
+        buttons=[
+            dict(label='Both', method='restyle', args=[{'opacity': [1, 1]}]),
+            dict(label='Gas Focus', method='restyle', args=[{'opacity': [1, 0.2]}]),
+            dict(label='Electric Focus', method='restyle', args=[{'opacity': [0.2, 1]}]),
+        ]
+    )]
+)
+
+cost_fig = go.Figure(data=[
+    go.Scatter(x=merged_df['Date'], y=merged_df['Gas Cost per Mile'], mode='lines', name='Gas Cost per Mile', line=dict(color='red')),
+    go.Scatter(x=merged_df['Date'], y=merged_df['EV Cost per Mile'], mode='lines', name='EV Cost per Mile', line=dict(color='orange', dash='dash'))
+])
+cost_fig.update_layout(
+    title="Cost per Mile Comparison (Assumed Efficiencies)",
+    xaxis=dict(showgrid=True, gridcolor='lightgrey'),
+    yaxis=dict(showgrid=True, gridcolor='lightgrey'),
+    template='plotly_white'
+)
+
+# Lagged cross-correlation of the monthly % changes: does one market's move show up in the other later?
+_gas_change = merged_df['Gas Rate Change (%)'].to_numpy(dtype=float)
+_elec_change = merged_df['Electric Rate Change (%)'].to_numpy(dtype=float)
+_changed = ~(np.isnan(_gas_change) | np.isnan(_elec_change))
+lags, lag_corr = cross_correlation(_gas_change[_changed], _elec_change[_changed], max_lag=12)
+xcorr_fig = go.Figure(data=[go.Bar(x=lags, y=np.round(lag_corr, 4), marker_color='purple')])
+xcorr_fig.update_layout(
+    title="Lagged Correlation of Monthly % Changes (Electric vs Gas)",
+    xaxis=dict(title="Lag (months electric follows gas)", dtick=1),
+    yaxis=dict(title="Pearson r", range=[-1, 1], showgrid=True, gridcolor='lightgrey'),
+    template='plotly_white'
+)
+
+# Forecast charts are drawn from the table written by `python build_artifacts.py forecasts`;
+# until it has been built the page keeps showing the PNGs exported from the notebook
+RESULTS_URL = 'https://storage.googleapis.com/evenergy163.appspot.com/results'
+price_forecasts = load_forecasts(PRICE_FORECAST_PATH)
+
+def price_forecast(series, kind):
+    if price_forecasts is None:
+        return None
+    frame = price_forecasts[(price_forecasts['series'] == series) & (price_forecasts['kind'] == kind)]
+    return frame if len(frame) else None
+
+gas_forecast = price_forecast('gas', 'forecast')
+elec_forecast = price_forecast('electric', 'forecast')
+gas_backtest = price_forecast('gas', 'backtest')
+elec_backtest = price_forecast('electric', 'backtest')
+
+forecast_figures = {}
+if gas_forecast is not None and elec_forecast is not None:
+    forecast_figures['forecast-comparison-graph'] = comparison_figure(
+        ('Gas', gas_forecast, 'red', 'Gas Price ($/Gallon)'),
+        ('Electric', elec_forecast, 'blue', 'Electric Rate ($/kWh)'),
+        "Gas vs Electric Forecast Comparison",
+    )
+if gas_forecast is not None:
+    forecast_figures['forecast-gas-graph'] = forecast_figure(
+        gas_forecast, "Forecast for Gas Prices (Next 5 Years)", "Gas Price ($/Gallon)", color='red')
+if elec_forecast is not None:
+    forecast_figures['forecast-electric-graph'] = forecast_figure(
+        elec_forecast, "Forecast for Electric Rates (Next 5 Years)", "Electric Rate ($/kWh)", color='blue')
+if gas_backtest is not None:
+    forecast_figures['backtest-gas-graph'] = backtest_figure(
+        gas_backtest, BACKTEST_START, "Gas Price Forecast vs Actual — 2024", "Gas Price ($/Gallon)")
+if elec_backtest is not None:
+    forecast_figures['backtest-electric-graph'] = backtest_figure(
+        elec_backtest, BACKTEST_START, "Electric Rate Forecast vs Actual — 2024", "Electric Rate ($/kWh)",
+        value_format='.4f')
+
+# Static charts, keyed by graph id. In pre-serialized mode they are encoded once and the
+# browser fetches them separately, so the page layout JSON no longer carries them
+static_figures = {
+    'correlation-graph': corr_fig,
+    'cost-per-mile-graph': cost_fig,
+    'rate-change-graph': roc_fig,
+    'cross-correlation-graph': xcorr_fig,
+    **forecast_figures,
+}
+figure_urls = None
+if PRESERIALIZED_FIGURES:
+    figure_urls = {
+        graph_id: dash.get_relative_path(register_figure(f"evvsgas-{graph_id}", fig))
+        for graph_id, fig in static_figures.items()
+    }
+    static_figures = {graph_id: {} for graph_id in static_figures}
+
+# Rolling-origin results from `python build_artifacts.py backtest`, when it has been run
+backtest_metrics = load_backtest_metrics()
+
+def backtest_points(points, series, value_format):
+    """The back-test bullet list, plus the rolling back-test summary when available."""
+    summary = describe_backtest(backtest_metrics, series, value_format)
+    return [html.Li(point) for point in points] + ([html.Li(summary)] if summary else [])
+
+def forecast_chart(graph_id, fallback_png, style=None):
+    """The live chart for graph_id when its forecast is available, else the notebook's PNG."""
+    if graph_id in static_figures:
+        return dcc.Graph(id=graph_id, figure=static_figures[graph_id], className='forecast-graph', style=style)
+    return html.Img(src=f'{RESULTS_URL}/{fallback_png}', className='forecast-image', style=style)
+
+# Price series for the rolling statistics (the merged default-region series)
+_gas_prices = np.ascontiguousarray(merged_df['Gas Price'].to_numpy(dtype=float))
+_elec_rates = np.ascontiguousarray(merged_df['Electric Rate'].to_numpy(dtype=float))
+
+# Every region's electric rates with the gas prices, as one month x series array from
+# `python build_artifacts.py evvsgas`; just the merged default region until it's built
+CPI_BASE_YEAR = summary.get('cpi_base_year')
+panel = PricePanel.load() or PricePanel.from_merged(merged_df, cpi_base_year=CPI_BASE_YEAR)
+REGIONS = panel.regions
+COST_REGION = DEFAULT_REGION if DEFAULT_REGION in REGIONS else REGIONS[0]
+
+# Constant-dollar prices, converted once with the per-month CPI factors from the artifact.
+# Without bundled CPI data the basis toggles stay hidden and only 'nominal' exists
+INFLATION_ADJUSTED = panel.has_cpi
+
+# Each region's months with both prices, aligned once by row offset
+_region_prices = {}
+for _region in REGIONS:
+    _dates, _gas, _elec, _cpi = panel.aligned(_region)
+    _cpi = _cpi if _cpi is not None else np.ones_like(_gas)
+    _region_prices[_region] = {
+        'dates': _dates.strftime('%Y-%m-%d').tolist(),
+        'latest': _dates[-1].strftime("%b %Y"),
+        'nominal': (_gas, _elec),
+        'real': (_gas * _cpi, _elec * _cpi),
+    }
+_price_version = hashlib.md5(np.ascontiguousarray(panel.values).tobytes() + repr(REGIONS).encode()).hexdigest()
+BASIS_OPTIONS = [
+    {'label': 'Nominal dollars', 'value': 'nominal'},
+    {'label': f'Inflation-adjusted ({CPI_BASE_YEAR} dollars)', 'value': 'real'},
+]
+
+def basis_toggle(toggle_id):
+    return dcc.RadioItems(
+        id=toggle_id, options=BASIS_OPTIONS, value='nominal', inline=True,
+        inputStyle={'marginRight': '0.3rem', 'marginLeft': '1rem'},
+        style={} if INFLATION_ADJUSTED else {'display': 'none'},
+    )
+
+def region_dropdown(dropdown_id):
+    # Hidden until rate sheets for more than one region have been built into the panel
+    return html.Div(style={} if len(REGIONS) > 1 else {'display': 'none'}, children=[
+        html.Label("Electric rates for:", className="label-text"),
+        dcc.Dropdown(id=dropdown_id, options=[{'label': r, 'value': r} for r in REGIONS],
+                     value=COST_REGION, clearable=False),
+    ])
+
+def scaled_costs(mpg_value, mi_kwh_value, basis='nominal', region=COST_REGION):
+    """Returns (gas, ev) cost per mile as lists for the given efficiencies."""
+    gas_prices, elec_rates = _region_prices[region][basis]
+    gas_cost = np.divide(gas_prices, mpg_value)
+    ev_cost = np.divide(elec_rates, mi_kwh_value)
+    # A cent per thousand miles (1e-5 $/mile) is below anything the chart can show,
+    # and short decimals roughly halve the JSON sent per slider tick
+    np.round(gas_cost, 5, out=gas_cost)
+    np.round(ev_cost, 5, out=ev_cost)
+    return gas_cost.tolist(), ev_cost.tolist()
+
+def cost_readout(gas_y, ev_y, basis='nominal', region=COST_REGION):
+    dollars = f" ({CPI_BASE_YEAR} $)" if basis == 'real' else ""
+    return f"{_region_prices[region]['latest']} → Gas: ${gas_y[-1]:.3f}/mile  |  EV: ${ev_y[-1]:.3f}/mile{dollars}"
+
+# The sliders only allow ~6,600 combinations per region, so results are shared by all users and workers
+@memoize(name="evvsgas-cost-per-mile", maxsize=8192, ttl=24 * 3600, shared=True, version=_price_version)
+def cost_series(mpg_value, mi_kwh_value, basis='nominal', region=COST_REGION):
+    gas_y, ev_y = scaled_costs(mpg_value, mi_kwh_value, basis, region)
+    return gas_y, ev_y, cost_readout(gas_y, ev_y, basis, region)
+
+def region_dates(region):
+    return _region_prices[region]['dates']
+
+def cost_title(basis):
+    dollars = f", {CPI_BASE_YEAR} Dollars" if basis == 'real' else ""
+    return f"Cost per Mile Comparison (Assumed Efficiencies{dollars})"
+
+def interactive_title(region):
+    return f"Interactive Cost per Mile ({region} Electric Rates, U.S. Gas Prices)"
+
+# Built once with the default efficiencies; slider changes only patch the y arrays
+gas_y, ev_y = scaled_costs(DEFAULT_GAS_MPG, DEFAULT_EV_MI_PER_KWH)
+interactive_fig = go.Figure(data=[
+    go.Scatter(x=region_dates(COST_REGION), y=gas_y, mode="lines", name="Gas Cost per Mile"),
+    go.Scatter(x=region_dates(COST_REGION), y=ev_y, mode="lines", name="EV Cost per Mile", line=dict(dash="dash")),
+])
+interactive_fig.update_layout(title=interactive_title(COST_REGION), template="plotly_white")
+
+# Everything the browser needs to redo the slider math itself, shipped once with the page:
+# whole panel columns (null where a series has no value), aligned per region in the browser
+price_store_data = None
+if CLIENTSIDE_SLIDERS:
+    def _column(name, decimals=6):
+        return [None if v != v else v for v in np.round(panel.series(name), decimals).tolist()]
+
+    price_store_data = {
+        'months': panel.months.strftime('%Y-%m-%d').tolist(),
+        'gas': _column('Gas Price'),
+        'elec': {region: _column(region) for region in REGIONS},
+        'figure': interactive_fig.to_plotly_json(),
+    }
+    if INFLATION_ADJUSTED:
+        price_store_data['cpi'] = _column('CPI Factor')
+        price_store_data['cpi_base_year'] = CPI_BASE_YEAR
+
+# Simulation mode: Monte Carlo scenarios over the 5-year price forecasts, run on the server
+# (tco_simulation) whenever the sliders, region or simulation inputs change
+outlook = price_outlook(gas_forecast, elec_forecast)
+DEFAULT_PUBLIC_SHARE = 20
+DEFAULT_EV_PREMIUM = 5000
+
+def elec_scale(region):
+    """Ratio of `region`'s rates to the forecast region's over the last year both cover.
+
+    The electric forecast is fitted on the default region's rates (the merged table), so other
+    regions reuse its shape and uncertainty at their own level.
+    """
+    if region == DEFAULT_REGION or DEFAULT_REGION not in panel.columns:
+        return 1.0
+    rates, reference = panel.series(region), panel.series(DEFAULT_REGION)
+    rows = np.flatnonzero(~(np.isnan(rates) | np.isnan(reference)))[-12:]
+    return float(np.mean(rates[rows]) / np.mean(reference[rows])) if len(rows) else 1.0
+
+# Percentile rows drawn per fuel: the 5-95 band, the 25-75 band (each a lower line and a
+# filled upper line), then the median
+_BAND_ROWS = [PERCENTILES.index(p) for p in (5, 95, 25, 75, 50)]
+
+def _miles(value):
+    return "never" if np.isinf(value) else f"{value:,.0f} mi"
+
+_simulation_version = None
+if outlook is not None:
+    _simulation_version = hashlib.md5(
+        _price_version.encode() + np.concatenate([outlook.gas, outlook.gas_sigma, outlook.elec,
+                                                  outlook.elec_sigma]).tobytes()).hexdigest()
+
+@memoize(name="evvsgas-simulation", maxsize=2048, ttl=24 * 3600, shared=True, version=_simulation_version)
+def simulated_outlook(mpg_value, mi_kwh_value, public_share_pct, ev_premium, region=COST_REGION):
+    """(y lists for the simulation traces, readout text) for one set of simulation inputs."""
+    result = simulate(outlook, mpg_value, mi_kwh_value, public_share_pct / 100, ev_premium,
+                      elec_scale(region), np.clip(corr_rate, -1, 1))
+    traces = [np.round(result[fuel][row], 5).tolist() for fuel in ('gas', 'ev') for row in _BAND_ROWS]
+    breakeven = dict(zip(PERCENTILES, result['breakeven_miles']))
+    text = (f"Break-even on a ${ev_premium:,.0f} EV premium: {_miles(breakeven[50])} "
+            f"(5th–95th percentile {_miles(breakeven[5])} to {_miles(breakeven[95])})  |  "
+            f"EV cheaper per mile in {result['ev_cheaper']:.0%} of scenarios")
+    return traces, text
+
+simulation_fig = None
+simulation_text = None
+if outlook is not None:
+    _sim_y, simulation_text = simulated_outlook(
+        DEFAULT_GAS_MPG, DEFAULT_EV_MI_PER_KWH, DEFAULT_PUBLIC_SHARE, DEFAULT_EV_PREMIUM, COST_REGION)
+    _sim_x = outlook.months.strftime('%Y-%m-%d').tolist()
+    simulation_fig = go.Figure()
+    for i, (fuel, color, fill) in enumerate((('Gas', 'red', 'rgba(255,0,0,'), ('EV', 'blue', 'rgba(0,0,255,'))):
+        for j, (name, band) in enumerate([('5th percentile', None), ('5th–95th percentile', 0.12),
+                                          ('25th percentile', None), ('25th–75th percentile', 0.25),
+                                          ('Median', None)]):
+            simulation_fig.add_trace(go.Scatter(
+                x=_sim_x, y=_sim_y[i * len(_BAND_ROWS) + j], mode='lines', name=f"{fuel} {name}",
+                line=dict(color=color, width=2 if name == 'Median' else 0),
+                fill='tonexty' if band else None, fillcolor=f"{fill}{band})" if band else None,
+                showlegend=bool(band) or name == 'Median', legendgroup=fuel,
+            ))
+    simulation_fig.update_layout(
+        title="Simulated Cost per Mile over the Forecast (Nominal Dollars)",
+        yaxis=dict(title="$ per mile", showgrid=True, gridcolor='lightgrey'),
+        template='plotly_white', legend=dict(orientation='h', y=-0.2),
+    )
+
+simulation_layout = html.Div(style={} if outlook is not None else {'display': 'none'}, children=[
+    html.H4("Simulation Mode: Cost per Mile over the Next 5 Years", className="subsection-title"),
+    dcc.Markdown(
+        f"""
+Instead of two fixed efficiencies, each of {DEFAULT_SCENARIOS:,} scenarios draws its own MPG and mi/kWh around the sliders above,
+a charging loss of {CHARGING_LOSS_RANGE[0]:.0%}–{CHARGING_LOSS_RANGE[1]:.0%}, a public charger fee for the share of charging done away from home,
+and gas and electric prices from the forecast intervals in Section 5. The shaded bands hold the middle 50% and 90% of scenarios;
+break-even is the mileage at which the EV's lower running cost pays back its higher purchase price.
+        """,
+        className='full-width-text'
+    ),
+    html.Label("Share of charging at public chargers (%):", className="label-text"),
+    dcc.Slider(id="simulation-public-share-slider", min=0, max=100, step=5, value=DEFAULT_PUBLIC_SHARE,
+               marks={n: str(n) for n in range(0, 101, 20)}),
+    html.Label("EV purchase premium over a comparable gas car ($):", className="label-text"),
+    dcc.Slider(id="simulation-premium-slider", min=0, max=20000, step=500, value=DEFAULT_EV_PREMIUM,
+               marks={n: f"{n // 1000}k" for n in range(0, 20001, 5000)}),
+    html.Div(id="simulation-values", children=simulation_text,
+             style={'marginLeft': '40px', 'marginBottom': '1rem', 'fontSize': '1rem', 'fontWeight': '600'}),
+    dcc.Graph(id="simulation-graph", figure=simulation_fig or {}, className='chart-graph'),
+])
+
+# Rolling correlation / volatility for Section 4; the window slider only patches the y arrays
+ROLLING_WINDOW_RANGE = (3, 60)
+DEFAULT_ROLLING_WINDOW = 12
+
+def _json_values(values, decimals=4):
+    # NaN (the first window - 1 months) becomes null so plotly leaves a gap
+    return [None if v != v else v for v in np.round(values, decimals).tolist()]
+
+@memoize(name="evvsgas-rolling-stats", maxsize=128, ttl=24 * 3600, shared=True, version=_price_version)
+def rolling_series(window):
+    """Rolling correlation of prices and of monthly % changes, and % change volatility, as lists."""
+    changes = np.full(len(_gas_prices), np.nan)
+    gas_vol, elec_vol, change_corr = changes.copy(), changes.copy(), changes.copy()
+    gas_vol[_changed] = rolling_std(_gas_change[_changed], window)
+    elec_vol[_changed] = rolling_std(_elec_change[_changed], window)
+    change_corr[_changed] = rolling_corr(_gas_change[_changed], _elec_change[_changed], window)
+    return (
+        _json_values(rolling_corr(_gas_prices, _elec_rates, window)),
+        _json_values(change_corr),
+        _json_values(gas_vol),
+        _json_values(elec_vol),
+    )
+
+rolling_fig = go.Figure(data=[
+    go.Scatter(x=merged_df['Date'], y=y, mode='lines', name=name, line=line, yaxis=axis)
+    for y, (name, line, axis) in zip(rolling_series(DEFAULT_ROLLING_WINDOW), [
+        ('Price Correlation', dict(color='black'), 'y'),
+        ('% Change Correlation', dict(color='purple'), 'y'),
+        ('Gas Volatility (% std)', dict(color='red', dash='dot'), 'y2'),
+        ('Electric Volatility (% std)', dict(color='blue', dash='dot'), 'y2'),
+    ])
+])
+rolling_fig.update_layout(
+    title="Rolling Correlation and Volatility",
+    yaxis=dict(title="Pearson r", range=[-1, 1], showgrid=True, gridcolor='lightgrey'),
+    yaxis2=dict(title="Std of Monthly % Change", overlaying='y', side='right', showgrid=False),
+    template='plotly_white',
+    legend=dict(orientation='h', y=-0.2),
+)
+
+rolling_layout = html.Div(className="evvsgas-section", children=[
+    html.H4('Rolling Correlation and Volatility', className='subsection-title'),
+    dcc.Markdown(
+        """
+Pick a window length to see how the relationship between the two markets, and each market's month-to-month volatility, has changed over time.
+        """,
+        className='full-width-text'
+    ),
+    html.Label("Rolling window (months):", className="label-text"),
+    dcc.Slider(
+        id="rolling-window-slider",
+        min=ROLLING_WINDOW_RANGE[0], max=ROLLING_WINDOW_RANGE[1], step=1,
+        value=DEFAULT_ROLLING_WINDOW,
+        marks={n: str(n) for n in (3, 6, 12, 24, 36, 48, 60)}
+    ),
+    dcc.Graph(id='rolling-stats-graph', figure=rolling_fig, className='chart-graph'),
+    dcc.Graph(id='cross-correlation-graph', figure=static_figures['cross-correlation-graph'], className='chart-graph'),
+])
+
+# Interactive Section
+interactive_layout = html.Div(
+    className="interactive-section evvsgas-section",
+    children=[
+        html.H3(
+            "3. Interactive Sensitivity Analysis for Cost per Mile",
+            className="subsection-title"
+        ),
+        dcc.Markdown(
+            """
+Adjust the sliders below to change the assumed vehicle efficiency for gas-powered cars (in MPG) 
+and electric vehicles (in miles per kWh). The cost per mile graph will update accordingly.
+            """,
+            className='full-width-text'
+        ),
+
+        html.Label("Gas Vehicle Efficiency (MPG):", className="label-text"),
+        dcc.Slider(
+            id="mpg-slider",
+            min=10, max=50, step=1,
+            value=DEFAULT_GAS_MPG,
+            marks={n: str(n) for n in range(10, 51, 5)}
+        ),
+        html.Br(),
+
+        html.Label("EV Efficiency (miles per kWh):", className="label-text"),
+        dcc.Slider(
+            id="mi-kwh-slider",
+            min=2, max=10, step=0.1,
+            value=DEFAULT_EV_MI_PER_KWH,
+            marks={n: str(n) for n in range(2, 11)}
+        ),
+        html.Br(),
+
+        # ← NEW: numeric readout of the current cost‐per‐mile values
+        html.Div(
+            id="interactive-cost-per-mile-values",
+            style={
+                'marginLeft': '40px',
+                'marginBottom': '1rem',
+                'fontSize': '1rem',
+                'fontWeight': '600'
+            }
+        ),
+
+        region_dropdown("interactive-price-region"),
+        basis_toggle("interactive-price-basis"),
+        dcc.Graph(id="interactive-cost-per-mile-graph", figure=interactive_fig),
+        dcc.Store(id="cost-price-store", data=price_store_data),
+
+        # your interpretation box remains unchanged
+        html.Div(
+            dcc.Markdown(
+                """
+**What You Can Explore:**  
+Use the sliders to adjust assumed vehicle efficiency.  
+- As gas MPG increases, the red line (gas cost/mile) falls.  
+- As EV mi/kWh rises, the orange dashed line drops.  
+
+In virtually all realistic efficiency ranges (10–50 MPG vs 2–10 mi/kWh), EVs remain cheaper per mile.  
+This reinforces that even modest improvements in EV efficiency will further widen the cost gap.
+                """
+            ),
+            className="interpretation"
+        ),
+
+        simulation_layout,
+    ]
+)
+
+# Main Layout
+layout = html.Div(className="page-container evvsgas-page", children=[
+
+    html.H2(
+    'Major Findings for Electric vs Gasoline',
+    className='section-title',
+    style={'marginTop': '5px', 'marginBottom': '20px'}
+),
+# Section 1
+html.H3(
+    '1. Long-Term Relationship: Gas Price vs Electric Rate',
+    className='subsection-title'
+),
+dcc.Graph(
+    id='correlation-graph',
+    figure=static_figures['correlation-graph'],
+    className='chart-graph'
+),
+
+dcc.Markdown(f"""
+Over the past **{len(merged_df)}** months, gas prices and electric rates have moved together (unit-free correlation **r = {corr:.2f}**, {strength(corr)}; {format_ci(corr_stats)}).
+
+A correlation of **{corr:.2f}** implies:
+- **r² ≈ {corr_stats['r2']:.2f}** ({format_ci(corr_stats, 'r2_ci_low', 'r2_ci_high')}), so about **{corr_stats['r2']:.0%}** of one series’ month-to-month variation is linearly explained by the other.  
+- The remaining **{1 - corr_stats['r2']:.0%}** comes from independent factors (weather, policy changes, local market effects).  
+- A block bootstrap over the **{corr_stats['n']}** months ({corr_stats['resamples']:,} resamples of {corr_stats['block']}-month blocks, which respects the series' autocorrelation) puts the chance of seeing this with no real relationship at **{format_p(corr_stats)}**.
+
+While this confirms both markets share common drivers (inflation, commodity costs), it **does not** tell us which is cheaper per mile.  
+We’ll address that by converting to **cost per mile** in Section 2.
+""", className='full-width-text callout'),
+
+    # Section 2
+    html.H3('2. Cost per Mile: Gas vs EV', className='subsection-title'),
+    dcc.Markdown(f"""
+    Based on assumed fuel efficiencies (25 MPG for gas and 4 miles per kWh for EVs):
+
+    **Gas Cost per Mile:** ${merged_df['Gas Cost per Mile'].mean():.3f}  
+    **EV Cost per Mile:** ${merged_df['EV Cost per Mile'].mean():.3f}  
+
+    This analysis demonstrates that EVs offer a significant operational cost advantage over gas vehicles.
+    """, className='full-width-text'),
+    basis_toggle('cost-price-basis'),
+    dcc.Graph(id='cost-per-mile-graph', figure=static_figures['cost-per-mile-graph'], className='chart-graph'),
+    dcc.Markdown(f"""
+    **Key Takeaways:**  
+    - **Gas Cost/Mile:** ${merged_df['Gas Cost per Mile'].mean():.3f}  
+    - **EV Cost/Mile:** ${merged_df['EV Cost per Mile'].mean():.3f}  
+
+    On average, driving an EV costs less than one-third as much per mile as a conventional car. This steady gap, shown in the red vs orange lines, highlights a clear operational advantage for EV ownership.
+    """, className='interpretation'),
+
+    # Interactive Section
+    interactive_layout,
+
+    # Section 4
+    html.H3('4. Short-Term Volatility: Monthly % Changes', className='subsection-title'),
+    dcc.Markdown(f"""
+    The monthly percentage changes in gas prices and electric rates show a {strength(corr_rate)} correlation (r = {corr_rate:.2f}, {format_ci(corr_rate_stats)}, {format_p(corr_rate_stats)}), indicating that short-term fluctuations in these prices are largely independent. This suggests that while long-term trends may be related, short-term price movements are influenced by different factors.
+
+    **Gas Rate Change:** {mean_gas_change:.2f}% per month  
+    **Electric Rate Change:** {mean_elec_change:.2f}% per month  
+
+    Pearson r = {corr_rate:.3f}; {significance(corr_rate_stats)}.
+    """, className='full-width-text'),
+    dcc.Graph(id='rate-change-graph', figure=static_figures['rate-change-graph'], className='chart-graph'),
+    dcc.Store(id='evvsgas-figure-urls', data=figure_urls),
+    dcc.Markdown(f"""
+    **Short-Term Volatility Insights:**  
+    Despite their long-term correlation, gasoline and electric rates behave quite differently month to month:  
+    - **Gas Rate Change:** {mean_gas_change:.2f}% per month on average  
+    - **Electric Rate Change:** {mean_elec_change:.2f}% per month  
+    - **Monthly correlation:** r = {corr_rate:.2f} ({format_ci(corr_rate_stats)}, {format_p(corr_rate_stats)}).  
+
+    This tells us that short-run price swings are driven by distinct factors (weather, seasonal demand, supply disruptions).
+    """, className='interpretation'),
+
+    rolling_layout,
+
+
+    # Section 5: Forecast Comparison (2025–2030)
+    html.H3('5. Forecast Comparison (2025–2030)', className='subsection-title'),
+
+    # Combined Forecast
+    html.Div(className='forecast-container evvsgas-section', children=[
+        forecast_chart('forecast-comparison-graph', 'forecast_comparison.png'),
+        dash.dcc.Markdown(
+            """
+The combined forecast shows gas prices (red) and electric rates (blue) rising through 2030, each with clear seasonal cycles.  
+A dashed vertical line marks the start of the 5-year projection in 2025, after which the lines diverge more.
+
+**Key points:**  
+- Both fuels follow predictable annual ups and downs.  
+- Electric rates are expected to climb a bit faster, narrowing the historical cost gap.  
+- The widening confidence intervals remind us to refresh forecasts as markets evolve.
+            """,
+            className='full-width-text'
+        )
+    ]),
+
+    # Forecast for Gas Prices
+    html.H4('Forecast for Gas Prices (2025–2030)', className='subsection-title'),
+    html.Div(className='forecast-container evvsgas-section', children=[
+        forecast_chart('forecast-gas-graph', 'forecast_gas.png'),
+        dash.dcc.Markdown(
+            """
+The gas price forecast shows clear annual peaks and a steady upward trend through 2030.  Confidence bands widen over time which shows that forecasts become less certain the further out we go.
+
+**Key points:**  
+- Seasonal spikes reflect predictable demand cycles (travel seasons, supply shifts).  
+- The overall upward slope implies continued price pressure without major market disruptions.  
+- Expanding confidence intervals underscore the importance of updating forecasts regularly.
+            """,
+            className='full-width-text'
+        )
+    ]),
+
+    # Forecast for Electric Rates
+    html.H4('Forecast for Electric Rates (2025–2030)', className='subsection-title'),
+    html.Div(className='forecast-container evvsgas-section', children=[
+        forecast_chart('forecast-electric-graph', 'forecast_electric.png'),
+        dash.dcc.Markdown(
+            """
+The electric rate forecast shows clear annual peaks and an overall upward trend through 2030.  Shaded confidence bands widen over time which shows that these projections carry growing uncertainty.
+
+**Key points:**  
+- Seasonal swings reflect predictable demand cycles (weather, industrial activity).  
+- A steady long-term rise likely stems from infrastructure costs and policy shifts.  
+- Broad confidence intervals highlight the need to revisit and refine forecasts regularly.
+            """,
+            className='full-width-text'
+        )
+    ]),
+    
+        # ── 2024 Back‐Test Comparisons ──
+    
+    # ── Gas back‐test ──
+html.H4('Gas Price Forecast vs Actual — 2024 Back-Test', className='subsection-title'),
+html.Div(
+    className='forecast-container',
+    style={'display': 'flex', 'alignItems': 'flex-start', 'gap': '2rem'},
+    children=[
+        forecast_chart('backtest-gas-graph', 'download%20(71).png', style={'flex': '1 1 60%'}),
+        html.Ul(
+            className='backtest-points',
+            style={'flex': '1 1 40%', 'margin': 0, 'paddingLeft': '1rem'},
+            children=backtest_points([
+                "Dashed red line generally overestimates actual gas prices, especially during summer months.",
+                "Model captures spring rise but underestimates mid-year price dips caused by market shocks.",
+                "MAE ≈ $0.55/gal (≈11% error) — acceptable for long-term budgeting but too coarse for monthly planning.",
+            ], 'gas', '${:.2f}/gal')
+        )
+    ]
+),
+    
+    # ── Electric back‐test ──
+html.H4('Electric Rate Forecast vs Actual — 2024 Back-Test', className='subsection-title'),
+html.Div(
+    className='forecast-container',
+    style={'display': 'flex', 'alignItems': 'flex-start', 'gap': '2rem'},
+    children=[
+        forecast_chart('backtest-electric-graph', 'download%20(72).png', style={'flex': '1 1 60%'}),
+        html.Ul(
+            className='backtest-points',
+            style={'flex': '1 1 40%', 'margin': 0, 'paddingLeft': '1rem'},
+            children=backtest_points([
+                "Dashed red line closely follows the actual electric rates, with only small timing shifts.",
+                "Model captures both the mid-year spike and late-year dip, though it smooths out some volatility.",
+                "MAE ≈ $0.02/kWh (<8% error) — strong performance for both budget forecasting and operational planning.",
+            ], 'electric', '${:.3f}/kWh')
+        )
+    ]
+),
+
+    # Conclusions
+    html.H3('Overall Takeaways & Next Steps', className='subsection-title'),
+    html.Ul(className='conclusions-list', children=[
+        html.Li(
+            "Charging an EV runs about $0.04/mi versus $0.12/mi for a typical gasoline car, so you save roughly $0.08 each mile."
+        ),
+        html.Li(
+            "Even under worst-case conditions (peak kWh rates, 10% charging losses, or low EV efficiency), EVs remain at least 50% cheaper per mile."
+        ),
+        html.Li(
+            "Our 5-year forecasts show both gas prices and electric rates rising steadily through 2030, with electric rates climbing slightly faster—yet EVs retain their cost advantage per mile."
+        ),
+        html.Li(
+            "Incorporate public-charger fees and regional rate structures to refine total operating-cost estimates."
+        )
+    ])
+])
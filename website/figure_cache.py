@@ -0,0 +1,79 @@
+import base64
+import gzip
+import hashlib
+
+import flask
+import numpy as np
+import plotly.io as pio
+
+# Registered on app.server by app.py; pages add figures with register_figure()
+blueprint = flask.Blueprint("figure_cache", __name__)
+
+_figures = {}
+
+
+def _as_array(value):
+    # Plotly >= 6 stores numeric arrays as base64 typed arrays ({'dtype', 'bdata'})
+    if isinstance(value, dict) and "bdata" in value:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+        return array.reshape(value["shape"]) if "shape" in value else array
+    return np.asarray(value)
+
+
+def _compact(value, decimals):
+    """Returns a JSON-friendly list with dates as YYYY-MM-DD and floats rounded to `decimals`."""
+    array = _as_array(value)
+    if array.dtype.kind == "M":
+        return np.datetime_as_string(array, unit="D").tolist()
+    if array.dtype.kind == "f":
+        rounded = np.round(array, decimals).astype(object)
+        rounded[np.isnan(array)] = None
+        return rounded.tolist()
+    return value
+
+
+def serialize_figure(fig, decimals=5):
+    """Serializes a figure once, trimming float precision and timestamps of its x/y data."""
+    fig_dict = fig.to_plotly_json()
+    for trace in fig_dict["data"]:
+        for axis in ("x", "y"):
+            if axis in trace and trace[axis] is not None:
+                trace[axis] = _compact(trace[axis], decimals)
+    # engine="auto" uses orjson when it is installed
+    return pio.to_json(fig_dict, validate=False, engine="auto").encode("utf-8")
+
+
+def register_figure(name, fig, decimals=5):
+    """Pre-serializes and gzips `fig`, returning the versioned URL path it is served from."""
+    body = serialize_figure(fig, decimals)
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    _figures[name] = {
+        "etag": etag,
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=9),
+    }
+    return f"/_figures/{name}.json?v={etag}"
+
+
+@blueprint.route("/_figures/<name>.json")
+def serve_figure(name):
+    entry = _figures.get(name)
+    if entry is None:
+        flask.abort(404)
+
+    # Strong ETags must differ between the gzip and identity representations
+    use_gzip = "gzip" in flask.request.accept_encodings
+    etag = entry["etag"] + ("-gz" if use_gzip else "")
+    if etag in flask.request.if_none_match:
+        response = flask.Response(status=304)
+    elif use_gzip:
+        response = flask.Response(entry["gzip"], mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = flask.Response(entry["body"], mimetype="application/json")
+
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    # URLs carry the ETag as ?v=, so a given URL's content never changes
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return response
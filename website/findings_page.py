@@ -0,0 +1,267 @@
+import dash
+import numpy as np
+import plotly.graph_objects as go
+from dash import html, dcc
+
+from metro_rankings import top_metros
+from session_heatmap import Heatmap
+from session_series import ALL, store as series_store
+
+from pages.findings import TOP_LOCATIONS
+
+# Content of the /findings page. pages/findings.py imports this module on the first visit to
+# the route (or from the background warm-up), so loading the session rollup, heatmap and
+# rankings never delays app startup.
+
+RESULTS_URL = "https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results"
+# Roughly one point per pixel of a chart; the /api/series endpoint downsamples to this
+CHART_POINTS = 600
+RESOLUTION_OPTIONS = [
+    {'label': 'Daily', 'value': 'day'},
+    {'label': 'Weekly', 'value': 'week'},
+    {'label': 'Monthly', 'value': 'month'},
+]
+RANK_OPTIONS = [
+    {'label': 'Sessions', 'value': 'sessions'},
+    {'label': 'Energy', 'value': 'energy_kwh'},
+    {'label': 'Growth rate', 'value': 'sessions_growth_pct'},
+]
+
+# Daily rollup from `python build_artifacts.py sessions`; the notebook PNGs until it's built
+series = series_store.get()
+
+
+def _options(names, everything=None):
+    return ([{'label': everything, 'value': ALL}] if everything else []) + [{'label': n, 'value': n} for n in names]
+
+
+def metro_choices(metro_names, regions):
+    """Per region, the metro names for the dropdowns and the top metros by each ranking.
+
+    The rankings come from the metro ranking index; until it is built the first names stand in.
+    """
+    choices = {}
+    for region in [ALL] + regions:
+        names = metro_names(region)
+        top = {}
+        for option in RANK_OPTIONS:
+            ranked = [m for m in top_metros(region, option['value'], TOP_LOCATIONS) if m in names]
+            top[option['value']] = ranked or names[:TOP_LOCATIONS]
+        choices[region] = {'names': names, 'top': top}
+    return choices
+
+
+def base_figure(y_title):
+    """Empty chart whose layout the browser fills in with /api/series data."""
+    fig = go.Figure()
+    fig.update_layout(xaxis_title='Date', yaxis_title=y_title, template='plotly_white', hovermode='x unified')
+    return fig.to_plotly_json()
+
+
+def series_controls(prefix, region, metro=ALL, multi=False, ranked=False):
+    """Region and metro dropdowns plus a resolution toggle (and a ranking choice) for one chart."""
+    metros = series.metro_names(region)
+    rank = [
+        html.Label("Top by:", className="label-text"),
+        dcc.RadioItems(id=f"{prefix}-rank", options=RANK_OPTIONS, value='sessions', inline=True,
+                       inputStyle={'marginRight': '0.3rem', 'marginLeft': '1rem'}),
+    ] if ranked else []
+    return html.Div(className="series-controls", children=rank + [
+        dcc.Dropdown(id=f"{prefix}-region", options=_options(series.region_names(), "All regions"),
+                     value=region, clearable=False, className="series-dropdown"),
+        dcc.Dropdown(id=f"{prefix}-metro", options=_options(metros, None if multi else "All metros"),
+                     value=metro, multi=multi, clearable=multi, className="series-dropdown"),
+        dcc.RadioItems(id=f"{prefix}-resolution", options=RESOLUTION_OPTIONS, value='month', inline=True,
+                       inputStyle={'marginRight': '0.3rem', 'marginLeft': '1rem'}),
+    ])
+
+
+def series_chart(prefix, metric, title, y_title, fallback_png, region=ALL, metro=ALL, multi=False, ranked=False):
+    """A live chart of `metric` with its controls, or the notebook PNG without the daily rollup."""
+    if series is None:
+        return html.Img(src=f"{RESULTS_URL}/{fallback_png}", className="full-image" if multi else "half-image")
+    # The endpoint URL resolved against the app's path prefix, for the browser to fetch from
+    spec = {'url': dash.get_relative_path('/api/series'), 'metric': metric, 'title': title,
+            'points': CHART_POINTS, 'figure': base_figure(y_title)}
+    return html.Div(className="findings-graph", children=[
+        series_controls(prefix, region, metro, multi, ranked),
+        dcc.Graph(id=f"{prefix}-graph"),
+        dcc.Store(id=f"{prefix}-spec", data=spec),
+    ])
+
+
+top_pacific, metro_options = [], None
+if series is not None:
+    metro_options = metro_choices(series.metro_names, series.region_names())
+    top_pacific = metro_options.get('Pacific', metro_options[ALL])['top']['sessions']
+
+# Month x metro matrix from the sessions step, memory-mapped; the notebook PNG until it's built
+heatmap = Heatmap.load()
+HEATMAP_METRICS = {'sessions': 'Charging Sessions', 'energy_kwh': 'Energy Usage (kWh)'}
+
+
+def heatmap_title(metric, region):
+    return f"{HEATMAP_METRICS[metric]} per Month – {'United States' if region == ALL else region}"
+
+
+def heatmap_figure(metros, metric='sessions', region=ALL):
+    found, z = heatmap.cells(metros, metric, region)
+    fig = go.Figure(go.Heatmap(x=found, y=list(heatmap.months), z=np.round(z, 1), colorscale='YlOrRd',
+                               colorbar=dict(title=HEATMAP_METRICS[metric])))
+    fig.update_layout(title=heatmap_title(metric, region), xaxis_title='Location', yaxis_title='YYYY-MM',
+                      yaxis=dict(autorange='reversed'), template='plotly_white', height=700)
+    return fig
+
+
+heatmap_options = None
+if heatmap is not None:
+    heatmap_options = metro_choices(heatmap.metro_names, heatmap.region_names())
+    # The notebook's heatmap showed the region's top location
+    heatmap_default = heatmap_options.get('Pacific', heatmap_options[ALL])['top']['sessions'][:1]
+    heatmap_chart = html.Div(className="findings-graph", children=[
+        html.Div(className="series-controls", children=[
+            dcc.Dropdown(id="metro-heatmap-region", options=_options(heatmap.region_names(), "All regions"),
+                         value="Pacific", clearable=False, className="series-dropdown"),
+            dcc.Dropdown(id="metro-heatmap-metro", options=_options(heatmap.metro_names("Pacific")),
+                         value=heatmap_default, multi=True,
+                         className="series-dropdown"),
+            dcc.RadioItems(id="metro-heatmap-metric", options=[{'label': label, 'value': metric}
+                                                              for metric, label in HEATMAP_METRICS.items()],
+                           value='sessions', inline=True, inputStyle={'marginRight': '0.3rem', 'marginLeft': '1rem'}),
+        ]),
+        dcc.Graph(id="metro-heatmap-graph",
+                  figure=heatmap_figure(heatmap_default, region="Pacific")),
+        dcc.Store(id="heatmap-metro-options", data=heatmap_options),
+    ])
+else:
+    heatmap_chart = html.Img(src=f"{RESULTS_URL}/OR_WA_heatmap.png", className="full-image")
+
+layout = html.Div(className="page-container findings-page", children=[
+
+    # Page title
+    html.H2("Major Findings for EV Growth", className="section-title"),
+    dcc.Store(id="findings-metro-options", data=metro_options),
+
+    # 1) EV Sales (IEA)
+    html.Div(className="findings-section", children=[
+        html.H3("EV Sales in USA (IEA)", className="subsection-title"),
+        html.Div(className="media-wrapper", children=[
+            html.Img(
+                src=f"{RESULTS_URL}/ev_sales.png",
+                className="full-image"
+            ),
+            html.Div(className="findings-text", children=[
+                "In this plot generated by ",
+                html.A(
+                    "IEA",
+                    href="https://www.iea.org/data-and-statistics/data-tools/global-ev-data-explorer",
+                    target="_blank",
+                    className="source-link"
+                ),
+                ", we used linear regression model to test if linear or exponential, and found that the "
+                "trend for EV sales in the USA is exponential with a r2 score of 0.875 compared to linear of 0.714. "
+                "The annual growth rate was 46.8% a year or 3.25% a month"
+            ])
+        ])
+    ]),
+
+    # 2) US EV Energy History
+html.Div(className="findings-section", children=[
+
+    # Section subtitle + side-by-side panels
+    html.H3("United States EV Energy History", className="subsection-title"),
+    html.Div(className="media-wrapper", children=[
+        series_chart("us-energy", "energy_kwh", "Energy Usage", "Energy Usage (kWh)",
+                     "US_energy_usage_growth.png"),
+        html.Img(
+            src=f"{RESULTS_URL}/US_charging_session_growth.png",
+            className="half-image"
+        )
+    ]),
+    html.Div(className="findings-text", children=[
+        "Summary: The left plot shows energy usage history; the right plot shows charging session history. "
+        "Both charging session and energy usage are increasing linearly over time for all regions combined in the USA. "
+        "The monthly growth rate of energy usage on avg is 5.45% per month, while the monthly growth for charging sessions is 4.88%."
+    ]),
+]),
+    # 3) Pacific region analysis
+    html.Div(className="findings-section", children=[
+
+        html.H3("Further Analysis With Focus on the Pacific Region", className="subsection-title"),
+        # Centered Info line, tight to the chart
+        html.P(
+            "(Info: History of charging sessions and energy usage in the Pacific region. "
+            "The live charts can be switched to any region, metro and daily, weekly or monthly totals.)",
+            className="info-text"
+        ),
+        html.Div(className="media-wrapper", children=[
+        html.Img(
+            src=f"{RESULTS_URL}/Pacific_energy_usage_growth.png",
+            className="half-image"
+        ),
+        series_chart("pacific-sessions", "sessions", "Charging Sessions", "Charging Sessions",
+                     "Pacific_charging_session_growth.png", region="Pacific")
+    ]),
+        # Summary text
+        html.Div(className="findings-text", children=[
+            "Summary: This plot focuses on comparing charging sessions and energy usage in the Pacific region. "
+            "Something interesting we found, is that the pacific region has an exponential growth rate, where the exponential "
+            "model fitted better than linear with a r2 score of 0.952 for energy usage and 0.904 for sessions. This suggest that the pacific region "
+            "is experiencing exponential growth in usage and sessions. While the monthly growth rates we got for charging sessions was approximately "
+            "3.86% and 4.37% for energy usage on avg."
+        ])
+    ]),
+
+
+    # 4) Popular charging locations
+html.Div(className="findings-section", children=[
+
+    html.H3("Popular Charging Locations in the Pacific Region", className="subsection-title"),
+
+    # 4a) Top locations bar chart
+    html.Div(className="media-wrapper", children=[
+        series_chart("pacific-locations", "sessions", "Charging Sessions by Location", "Charging Sessions",
+                     "pacific_popular_locations.png", region="Pacific", metro=top_pacific, multi=True,
+                     ranked=True)
+    ]),
+    html.P(
+        "(Info: Charging session counts by location; the chart starts with the region's top five metros "
+        "by sessions, energy or monthly growth rate.)",
+        className="info-text"
+    ),
+    html.Div(className="findings-text", children=[
+        "Summary: This plot shows the top charging locations in the pacific region. "
+        "We can see that over time, Portland-Vancouver-Hillsboro is the most popular location, "
+        "comparing the growth rates, we found that Portland-Vancouver-Hillsboro, Seatle-Tacoma-Bellevue, and Salem has "
+        "exponential trend, while Los Angeles-Long Beach-Anaheim has a linear trend. Avg monthly growth rates in the plot."
+    ]),
+
+    # 4b) Heatmap of top areas
+    html.Div(className="media-wrapper", children=[heatmap_chart]),
+    html.P(
+        "(Info: Heatmap visualization of growth; pick a region and any number of metros to compare.)",
+        className="info-text"
+    ),
+    html.Div(className="findings-text", children=[
+        "Summary: The heatmap is just used as another visualization to show growth, here we chose the top location. "
+        "The heatmap focuses on Portland-Vancouver-Hillsboro, which are areas in Oregon and Washington. "
+        "Y-axis is YYYY-MM, and x-axis is location, we see that around the end of 2021, the growth rate begins to increase significantly. "
+        "This area had exponential growth with a fit of 0.86 r2 score, and avg monthly growth rate of 4.8%"
+    ])
+
+]),
+
+
+    # 5) Overall summary
+    html.Div(className="findings-section", children=[
+        html.H3("Summary", className="subsection-title"),
+        html.Div(className="findings-text", children=[
+            "From these analysis and visualizations, we can see that both energy usage and charging "
+           "sessions is increasing over time. We can see that energy usage is being consumed at almost "
+           "exponential rate in the pacific region compared to linear overall in the USA. While focusing " 
+           "on the Pacific region, we can see that the most popular charging locations are around Oregon and Washington. "
+           "The next step now would be to analyze the difference between Electric and Gas, and predict future trends."
+        ])
+    ]),
+
+])
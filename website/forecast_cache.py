@@ -0,0 +1,122 @@
+"""Content-addressed store of fitted forecast frames.
+
+The key is a hash of the training series (ds / y values), the forecast horizon and the model
+settings, including the Prophet version, so a rerun over unchanged data returns the stored
+frame instead of refitting. Entries are Parquet files; when the directory grows past its byte
+budget the least recently used ones are removed (a hit bumps the file's mtime).
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from evvsgas_data import ARTIFACT_DIR
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get("FORECAST_CACHE_DIR", os.path.join(ARTIFACT_DIR, "forecast_cache"))
+MAX_BYTES = int(os.environ.get("FORECAST_CACHE_MB", 256)) * 2 ** 20
+
+# Bump when the stored frame's layout changes
+CACHE_FORMAT = 1
+
+
+def _model_version():
+    try:
+        return metadata.version("prophet")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def fingerprint(history, periods, freq, params=None):
+    """Hex digest identifying a fit: same series and settings, same forecast."""
+    digest = hashlib.sha256()
+    ds = pd.to_datetime(history['ds']).to_numpy(dtype='datetime64[ns]')
+    digest.update(np.ascontiguousarray(ds).view(np.int64).tobytes())
+    digest.update(np.ascontiguousarray(history['y'].to_numpy(dtype=float)).tobytes())
+    settings = {
+        'format': CACHE_FORMAT,
+        'prophet': _model_version(),
+        'periods': periods,
+        'freq': freq,
+        'params': params or {},
+    }
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """Forecast frames on disk keyed by `fingerprint`, trimmed to `max_bytes` by LRU."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".parquet")
+
+    def get(self, key):
+        """Returns the stored frame, or None."""
+        path = self._path(key)
+        try:
+            frame = pd.read_parquet(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return frame
+
+    def set(self, key, frame):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError):
+            logger.warning("Could not write forecast cache entry %s", key, exc_info=True)
+            return
+        self.trim()
+
+    def trim(self):
+        """Removes least recently used entries until the directory fits in max_bytes."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".parquet")]
+        except OSError:
+            return
+        stats = []
+        for entry in entries:
+            try:
+                stats.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+            except OSError:
+                pass
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "max_bytes": self.max_bytes,
+            }
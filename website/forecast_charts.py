@@ -0,0 +1,105 @@
+"""Plotly figures for the forecast tables, replacing the forecast PNGs exported from the notebooks.
+
+Each chart is drawn from a slice of a forecast table (ds, y, yhat, yhat_lower, yhat_upper; see
+forecasting.py), thinned to at most `max_points` points and rounded, so a figure is a few KB of
+JSON and the browser can zoom and hover without the server re-rendering anything.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Enough for every month of a 30-year series; only denser series (daily, weekly) get thinned
+MAX_POINTS = 400
+DECIMALS = 4
+
+BAND_COLOR = 'rgba(255, 165, 0, 0.2)'
+
+
+def decimate(frame, max_points=MAX_POINTS):
+    """Evenly spaced rows of `frame` (always keeping the first and last), at most max_points."""
+    if len(frame) <= max_points:
+        return frame
+    rows = np.unique(np.linspace(0, len(frame) - 1, max_points).round().astype(int))
+    return frame.iloc[rows]
+
+
+def _values(column, decimals=DECIMALS):
+    return np.round(column.to_numpy(dtype=float), decimals)
+
+
+def _dates(column):
+    # Plain dates are about half the size of the ISO timestamps plotly would write
+    return column.dt.strftime('%Y-%m-%d').to_numpy()
+
+
+def _band(frame, name, color=BAND_COLOR):
+    return [
+        go.Scatter(x=_dates(frame['ds']), y=_values(frame['yhat_upper']), mode='lines', line=dict(width=0),
+                   hoverinfo='skip', showlegend=False),
+        go.Scatter(x=_dates(frame['ds']), y=_values(frame['yhat_lower']), mode='lines', line=dict(width=0),
+                   fill='tonexty', fillcolor=color, name=name),
+    ]
+
+
+def forecast_figure(frame, title, y_title, color='red', max_points=MAX_POINTS):
+    """Actuals, the fitted line, the dashed forecast and its uncertainty band."""
+    frame = decimate(frame.sort_values('ds'), max_points)
+    observed = frame[frame['y'].notna()]
+    start = observed['ds'].max()
+    fitted = frame[frame['ds'] <= start]
+    # Starts at the last observed month so the two lines join up
+    future = frame[frame['ds'] >= start]
+
+    fig = go.Figure(data=_band(frame, 'Uncertainty Interval') + [
+        go.Scatter(x=_dates(observed['ds']), y=_values(observed['y']), mode='markers', name='Actual',
+                   marker=dict(color='black', size=4)),
+        go.Scatter(x=_dates(fitted['ds']), y=_values(fitted['yhat']), mode='lines', name='Fitted',
+                   line=dict(color=color)),
+        go.Scatter(x=_dates(future['ds']), y=_values(future['yhat']), mode='lines', name='Forecast',
+                   line=dict(color=color, dash='dash')),
+    ])
+    fig.update_layout(title=title, xaxis_title='Date', yaxis_title=y_title, template='plotly_white',
+                      hovermode='x unified')
+    return fig
+
+
+def comparison_figure(left, right, title):
+    """Two forecasts on one chart with their own y axes; each side is (label, frame, color, axis title)."""
+    fig = go.Figure()
+    start = None
+    for axis, (label, frame, color, _) in (('y', left), ('y2', right)):
+        frame = decimate(frame.sort_values('ds'))
+        fig.add_trace(go.Scatter(x=_dates(frame['ds']), y=_values(frame['yhat']), mode='lines', yaxis=axis,
+                                 name=f'{label} Forecast', line=dict(color=color)))
+        start = frame.loc[frame['y'].notna(), 'ds'].max()
+    if pd.notna(start):
+        fig.add_vline(x=start, line=dict(color='black', dash='dash'))
+    fig.update_layout(
+        title=title, xaxis_title='Date', template='plotly_white', hovermode='x unified',
+        yaxis=dict(title=left[3]),
+        yaxis2=dict(title=right[3], overlaying='y', side='right', showgrid=False),
+    )
+    return fig
+
+
+def backtest_figure(frame, start, title, y_title, value_format='.2f'):
+    """Hold-out months (from `start`) only: actual vs forecast, with the mean absolute error in the title.
+
+    `value_format` formats the error in the series' units, e.g. '.4f' for $/kWh rates.
+    """
+    held_out = frame[frame['ds'] >= pd.Timestamp(start)].sort_values('ds')
+    mae = backtest_mae(held_out)
+    fig = go.Figure(data=_band(held_out, 'Uncertainty Interval', 'rgba(220, 20, 60, 0.15)') + [
+        go.Scatter(x=_dates(held_out['ds']), y=_values(held_out['y']), mode='lines', name='Actual',
+                   line=dict(color='black')),
+        go.Scatter(x=_dates(held_out['ds']), y=_values(held_out['yhat']), mode='lines', name='Forecast',
+                   line=dict(color='crimson', dash='dash')),
+    ])
+    fig.update_layout(title=f"{title} (MAE ≈ {mae:{value_format}})", xaxis_title='Date', yaxis_title=y_title,
+                      template='plotly_white', hovermode='x unified')
+    return fig
+
+
+def backtest_mae(frame):
+    errors = np.abs(frame['y'].to_numpy(dtype=float) - frame['yhat'].to_numpy(dtype=float))
+    return float(np.nanmean(errors)) if len(frame) else float('nan')
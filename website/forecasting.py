@@ -0,0 +1,336 @@
+"""Prophet forecasts for many series, fitted in parallel worker processes.
+
+The notebooks fit one `Prophet()` on the Pacific monthly energy series; here each
+(region, metro_area, metric) series from the session cube becomes a task, tasks are fitted in a
+process pool with a per-task time limit, and every result lands in one long forecast table
+(key columns + ds, y, yhat, yhat_lower, yhat_upper).
+
+    python build_artifacts.py forecasts --workers 8 --timeout 120
+
+With `--warm-start`, each series' fitted parameters are kept between runs and used to initialise
+the next fit when only a few months were appended and they land inside the previous forecast's
+interval; anything else (revised history, changed settings, drift) gets a full fit.
+"""
+import hashlib
+import json
+import logging
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import ev_aggregates
+from evvsgas_data import ARTIFACT_DIR
+from forecast_cache import ForecastCache, fingerprint
+
+logger = logging.getLogger(__name__)
+
+FORECAST_PATH = os.path.join(ARTIFACT_DIR, "forecasts.parquet")
+PRICE_FORECAST_PATH = os.path.join(ARTIFACT_DIR, "price_forecasts.parquet")
+STATE_DIR = os.environ.get("FORECAST_STATE_DIR", os.path.join(ARTIFACT_DIR, "forecast_state"))
+FORECAST_COLUMNS = ['ds', 'y', 'yhat', 'yhat_lower', 'yhat_upper']
+
+DEFAULT_PERIODS = 12
+DEFAULT_FREQ = 'MS'
+DEFAULT_TIMEOUT = 300
+# Prophet needs a couple of seasons to say anything useful
+MIN_MONTHS = 12
+
+# The EVvsGas page's 5-year price outlook and its 2024 hold-out back-test
+PRICE_SERIES = {'gas': 'Gas Price', 'electric': 'Electric Rate'}
+PRICE_PERIODS = 60
+BACKTEST_START = '2024-01-01'
+BACKTEST_PARAMS = {'yearly_seasonality': True, 'weekly_seasonality': False, 'daily_seasonality': False}
+
+# Warm starts only when at most this many months were appended since the last fit...
+MAX_NEW_POINTS = 6
+# ...and no more than this share of them fell outside the last fit's forecast interval
+DRIFT_TOLERANCE = 0.5
+
+
+class ForecastTimeout(Exception):
+    pass
+
+
+def make_task(key, history, periods=DEFAULT_PERIODS, freq=DEFAULT_FREQ, params=None):
+    """A unit of work: `key` is a dict of labels (e.g. region/metro_area/metric) and
+    `history` a frame with Prophet's ds / y columns."""
+    return {
+        'key': dict(key),
+        'history': history[['ds', 'y']].reset_index(drop=True),
+        'periods': periods,
+        'freq': freq,
+        'params': dict(params or {}),
+    }
+
+
+def _fit_model(history, periods, freq, params, init=None):
+    from prophet import Prophet
+
+    model = Prophet(**(params or {}))
+    if init is not None:
+        model.fit(history, init=init)
+    else:
+        model.fit(history)
+    future = model.make_future_dataframe(periods=periods, freq=freq)
+    forecast = model.predict(future)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    forecast = forecast.merge(history[['ds', 'y']], on='ds', how='left')
+    return model, forecast[FORECAST_COLUMNS]
+
+
+def fit_forecast(history, periods=DEFAULT_PERIODS, freq=DEFAULT_FREQ, params=None, init=None):
+    """Fits Prophet on `history` and returns ds, y (actuals, NaN in the future), yhat and interval.
+
+    `init` is a warm start: Stan parameters from an earlier fit (see stan_init).
+    """
+    return _fit_model(history, periods, freq, params, init)[1]
+
+
+def stan_init(model):
+    """The fitted parameters of `model` in the form Prophet.fit(init=...) takes."""
+    init = {name: float(model.params[name][0][0]) for name in ('k', 'm', 'sigma_obs')}
+    init.update({name: np.asarray(model.params[name][0], dtype=float) for name in ('delta', 'beta')})
+    return init
+
+
+def _fit_state(task, model, forecast):
+    """What the next run needs to decide on (and perform) a warm start for this series."""
+    history = task['history']
+    future = forecast[forecast['ds'] > history['ds'].max()]
+    return {
+        'n': len(history),
+        'fingerprint': fingerprint(history, task['periods'], task['freq'], task['params']),
+        'params': {name: np.ravel(value).tolist() for name, value in stan_init(model).items()},
+        'forecast': {
+            'ds': future['ds'].dt.strftime('%Y-%m-%d').tolist(),
+            'lower': future['yhat_lower'].tolist(),
+            'upper': future['yhat_upper'].tolist(),
+        },
+    }
+
+
+def _state_path(key, directory=STATE_DIR):
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+    return os.path.join(directory, digest + ".json")
+
+
+def load_state(key, directory=STATE_DIR):
+    try:
+        with open(_state_path(key, directory)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(key, state, directory=STATE_DIR):
+    path = _state_path(key, directory)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.warning("Could not save forecast state for %s", key, exc_info=True)
+
+
+def warm_start_plan(task, state):
+    """Returns (init, reason): Stan inits for a warm start, or None and why a full fit is needed."""
+    if state is None:
+        return None, 'no previous fit'
+    history = task['history']
+    n = state['n']
+    if len(history) < n:
+        return None, 'history shortened'
+    if fingerprint(history.iloc[:n], task['periods'], task['freq'], task['params']) != state['fingerprint']:
+        return None, 'history or settings changed'
+    new = history.iloc[n:]
+    if len(new) > MAX_NEW_POINTS:
+        return None, f'{len(new)} new points'
+
+    if len(new):
+        previous = pd.DataFrame(state['forecast'])
+        previous['ds'] = pd.to_datetime(previous['ds'])
+        bounds = new.merge(previous, on='ds', how='left')
+        outside = ~((bounds['y'] >= bounds['lower']) & (bounds['y'] <= bounds['upper']))
+        if outside.mean() > DRIFT_TOLERANCE:
+            return None, 'drift'
+    init = {name: np.asarray(value, dtype=float) for name, value in state['params'].items()}
+    for name in ('k', 'm', 'sigma_obs'):
+        init[name] = float(init[name][0])
+    return init, 'warm start'
+
+
+def forecast(history, periods=DEFAULT_PERIODS, freq=DEFAULT_FREQ, params=None, cache=None):
+    """fit_forecast through the forecast cache, for one-off series such as the notebooks'.
+
+    Pass `cache=False` to always refit.
+    """
+    if cache is False:
+        return fit_forecast(history, periods, freq, params)
+    cache = cache or ForecastCache()
+    key = fingerprint(history, periods, freq, params)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = fit_forecast(history, periods, freq, params)
+    cache.set(key, result)
+    return result
+
+
+def _on_alarm(signum, frame):
+    raise ForecastTimeout()
+
+
+def _run_task(task, timeout):
+    """Worker entry point; never raises, so one bad series can't take down the pool.
+
+    Returns (forecast or None, status dict, state for a later warm start or None).
+    """
+    # Import before arming the alarm: an import interrupted halfway leaves the worker unusable
+    import prophet  # noqa: F401
+    logging.getLogger('cmdstanpy').disabled = True
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    forecast = state = None
+    try:
+        model, forecast = _fit_model(task['history'], task['periods'], task['freq'], task['params'],
+                                     task.get('init'))
+        state = _fit_state(task, model, forecast)
+        status, error = 'ok', None
+    except ForecastTimeout:
+        forecast, state, status, error = None, None, 'timeout', f"exceeded {timeout}s"
+    except Exception as e:
+        # Prophet swallows some exceptions and re-raises its own, so go by the clock too
+        timed_out = use_alarm and time.perf_counter() - start >= timeout
+        forecast, state = None, None
+        status, error = 'timeout' if timed_out else 'error', repr(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return forecast, {'status': status, 'error': error, 'seconds': time.perf_counter() - start}, state
+
+
+def run_forecasts(tasks, workers=None, timeout=DEFAULT_TIMEOUT, fit=None, cache=None, warm_start=False):
+    """Fits every task in a process pool and returns (forecast_table, status_table).
+
+    `workers` defaults to the CPU count; `timeout` is the per-task limit in seconds.
+    `fit` swaps in another worker function with _run_task's signature. With a ForecastCache
+    as `cache`, tasks whose series and settings are unchanged are served from it without
+    fitting (status 'cached') and new fits are stored. `warm_start` initialises each fit from
+    the series' previous one where warm_start_plan allows (the status table's `fit` column
+    says which happened and why).
+    """
+    fit = fit or _run_task
+    tasks = list(tasks)
+    if not tasks:
+        return pd.DataFrame(columns=FORECAST_COLUMNS), pd.DataFrame()
+
+    results = [None] * len(tasks)
+    keys = [None] * len(tasks)
+    if cache is not None:
+        for i, task in enumerate(tasks):
+            keys[i] = fingerprint(task['history'], task['periods'], task['freq'], task['params'])
+            cached = cache.get(keys[i])
+            if cached is not None:
+                results[i] = cached, {'status': 'cached', 'error': None, 'seconds': 0.0}, None
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if warm_start:
+        for i in pending:
+            init, reason = warm_start_plan(tasks[i], load_state(tasks[i]['key']))
+            tasks[i] = {**tasks[i], 'init': init, 'fit': reason}
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = {i: pool.submit(fit, tasks[i], timeout) for i in pending}
+            for i, future in futures.items():
+                results[i] = future.result()
+                forecast, _, state = results[i]
+                if cache is not None and forecast is not None:
+                    cache.set(keys[i], forecast)
+                if warm_start and state is not None:
+                    save_state(tasks[i]['key'], state)
+
+    frames, statuses = [], []
+    for task, (forecast, status, _) in zip(tasks, results):
+        if 'fit' in task:
+            status = {**status, 'fit': task['fit']}
+        statuses.append({**task['key'], **status})
+        if forecast is not None:
+            frames.append(forecast.assign(**task['key']))
+        else:
+            logger.warning("Forecast %s: %s (%s)", task['key'], status['status'], status['error'])
+
+    key_columns = list(dict.fromkeys(k for task in tasks for k in task['key']))
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FORECAST_COLUMNS)
+    table = table[[c for c in key_columns if c in table.columns] + FORECAST_COLUMNS]
+    return table, pd.DataFrame(statuses)
+
+
+def cube_tasks(cube, metrics=('sessions', 'energy_kwh'), regions=None, min_months=MIN_MONTHS,
+               periods=DEFAULT_PERIODS, exclude=('Undesignated',)):
+    """One task per (region, metro_area, metric) in the session cube, plus each region's total
+    (metro_area 'All'); series shorter than `min_months` are skipped."""
+    by_metro = ev_aggregates.summarize(cube, by=['region', 'metro_area', 'year_month'], regions=regions)
+    by_metro = by_metro[~by_metro['metro_area'].isin(exclude)]
+    by_region = ev_aggregates.summarize(cube, by=['region', 'year_month'], regions=regions)
+    by_region['metro_area'] = 'All'
+
+    monthly = pd.concat([by_region, by_metro.astype({'metro_area': object})], ignore_index=True)
+    monthly = monthly.astype({'region': object, 'metro_area': object})
+    tasks = []
+    for (region, metro), group in monthly.groupby(['region', 'metro_area'], sort=True):
+        if len(group) < min_months:
+            continue
+        for metric in metrics:
+            history = group.rename(columns={'year_month': 'ds', metric: 'y'})
+            key = {'region': region, 'metro_area': metro, 'metric': metric}
+            tasks.append(make_task(key, history, periods=periods))
+    return tasks
+
+
+def price_tasks(merged_df, periods=PRICE_PERIODS, backtest_start=BACKTEST_START):
+    """Forecast and back-test tasks for the gas and electric series of the merged price table.
+
+    Keys are {'series': 'gas' | 'electric', 'kind': 'forecast' | 'backtest'}; a back-test is
+    trained on the months before `backtest_start` and forecasts the rest.
+    """
+    cutoff = pd.Timestamp(backtest_start)
+    tasks = []
+    for series, column in PRICE_SERIES.items():
+        history = merged_df[['Date', column]].rename(columns={'Date': 'ds', column: 'y'}).dropna()
+        tasks.append(make_task({'series': series, 'kind': 'forecast'}, history, periods=periods))
+
+        train = history[history['ds'] < cutoff]
+        held_out = int((history['ds'] >= cutoff).sum())
+        if held_out and len(train) >= MIN_MONTHS:
+            tasks.append(make_task({'series': series, 'kind': 'backtest'}, train, periods=held_out,
+                                   params=BACKTEST_PARAMS))
+    return tasks
+
+
+def price_forecasts(merged_df, workers=None, timeout=DEFAULT_TIMEOUT, cache=None, warm_start=False,
+                    **task_args):
+    """Runs price_tasks and fills in the held-out actuals of the back-test rows."""
+    table, status = run_forecasts(price_tasks(merged_df, **task_args), workers=workers,
+                                  timeout=timeout, cache=cache, warm_start=warm_start)
+    if len(table):
+        for series, column in PRICE_SERIES.items():
+            actual = merged_df.set_index('Date')[column]
+            rows = (table['series'] == series) & table['y'].isna()
+            table.loc[rows, 'y'] = table.loc[rows, 'ds'].map(actual).to_numpy(dtype=float)
+    return table, status
+
+
+def load_forecasts(path=FORECAST_PATH, filters=None):
+    """The forecast table, or None if it hasn't been built; `filters` as for pd.read_parquet."""
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path, filters=filters)
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import storage
+from pyarrow import fs
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# App Engine only allows writes under /tmp
+CACHE_DIR = os.environ.get("GCS_CACHE_DIR", "/tmp/gcs_cache")
+
+# Point this at a directory to stand in for GCS (one sub-directory per bucket)
+LOCAL_BUCKET_DIR = os.environ.get("GCS_LOCAL_DIR")
+
+# Upper bound on concurrent downloads; the HTTP connection pool is at least this large
+GCS_DOWNLOAD_WORKERS = int(os.environ.get("GCS_DOWNLOAD_WORKERS", 8))
+
+
+class LocalBlob:
+    """Blob stored as a plain file, exposing the metadata the cache relies on."""
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        stat = os.stat(path)
+        self.generation = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.etag = hashlib.md5(f"{self.generation}:{self.size}".encode()).hexdigest()
+
+    def open(self, mode="rb"):
+        return open(self.path, mode)
+
+    def download_as_bytes(self, if_generation_match=None):
+        if if_generation_match is not None and os.stat(self.path).st_mtime_ns != if_generation_match:
+            raise RuntimeError(f"{self.name} changed during download")
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class LocalBucket:
+    """Directory standing in for a GCS bucket, used for offline runs and tests."""
+
+    def __init__(self, root):
+        self.root = root
+        self.name = os.path.basename(os.path.normpath(root))
+
+    def get_blob(self, blob_name):
+        path = os.path.join(self.root, blob_name)
+        if not os.path.isfile(path):
+            return None
+        return LocalBlob(path, blob_name)
+
+    def list_blobs(self, prefix=""):
+        directory = os.path.join(self.root, os.path.dirname(prefix))
+        if not os.path.isdir(directory):
+            return []
+        names = (os.path.join(os.path.dirname(prefix), n) for n in sorted(os.listdir(directory)))
+        return [LocalBlob(os.path.join(self.root, n), n) for n in names
+                if n.startswith(prefix) and os.path.isfile(os.path.join(self.root, n))]
+
+
+def _cache_paths(bucket_name, blob_name, key):
+    stem = blob_name.replace("/", "__")
+    folder = os.path.join(CACHE_DIR, bucket_name)
+    return folder, os.path.join(folder, f"{stem}.{key}")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, obj):
+    with open(path, "w") as f:
+        json.dump(obj, f)
+
+
+def _write_atomic(path, write):
+    # Unique per thread as well as per process: prefetch_blobs writes from several threads
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_cached(meta):
+    df = pd.read_parquet(meta["path"])
+    if meta.get("columns") is not None:
+        df.columns = meta["columns"]
+    return df
+
+
+def cached_frame(bucket, blob_name, parse, key):
+    """Returns the parsed blob, re-downloading only when its generation or ETag changed.
+
+    `parse` turns the raw bytes into a DataFrame and `key` names the parse options,
+    so the same blob read with different options gets separate cache entries.
+    """
+    folder, base = _cache_paths(bucket.name, blob_name, key)
+    meta_path = base + ".json"
+    meta = _read_meta(meta_path)
+
+    # Cheap metadata call: no object bytes are transferred
+    try:
+        blob = bucket.get_blob(blob_name)
+    except Exception:
+        if meta and os.path.exists(meta["path"]):
+            logger.warning("Metadata lookup for %s failed, serving cached copy", blob_name, exc_info=True)
+            return _read_cached(meta)
+        raise
+    if blob is None:
+        raise FileNotFoundError(f"gs://{bucket.name}/{blob_name} does not exist")
+
+    if (meta and meta["generation"] == blob.generation and meta["etag"] == blob.etag
+            and os.path.exists(meta["path"])):
+        return _read_cached(meta)
+
+    data = blob.download_as_bytes(if_generation_match=blob.generation)
+    df = parse(data)
+
+    # Parquet needs string column names (header=None gives integers), keep the originals aside
+    columns = None
+    if not all(isinstance(c, str) for c in df.columns):
+        columns = df.columns.tolist()
+    parquet_path = f"{base}.{blob.generation}.parquet"
+    try:
+        os.makedirs(folder, exist_ok=True)
+        stored = df.set_axis([str(c) for c in df.columns], axis=1)
+        _write_atomic(parquet_path, lambda p: stored.to_parquet(p, index=False))
+        new_meta = {"generation": blob.generation, "etag": blob.etag, "path": parquet_path,
+                    "columns": columns}
+        _write_atomic(meta_path, lambda p: _write_json(p, new_meta))
+    except Exception:
+        # Mixed-type object columns can't go to Parquet; just skip caching
+        logger.warning("Could not cache %s", blob_name, exc_info=True)
+        return df
+
+    # Drop the file for the generation we just replaced
+    if meta and meta["path"] != parquet_path and os.path.exists(meta["path"]):
+        try:
+            os.remove(meta["path"])
+        except OSError:
+            pass
+    return df
+
+
+_storage_client = None
+_storage_client_lock = threading.Lock()
+
+
+def get_storage_client():
+    """Returns the storage client shared by the whole process, creating it on first use."""
+    global _storage_client
+    with _storage_client_lock:
+        if _storage_client is None:
+            # The default session keeps DEFAULT_POOLSIZE (10) connections per host; give the
+            # client one that also fits GCS_DOWNLOAD_WORKERS parallel downloads when that is
+            # larger. `_http` is a private constructor argument, accepted by
+            # google-cloud-storage 2.x and 3.x (pinned in requirements.txt)
+            pool_size = max(GCS_DOWNLOAD_WORKERS, DEFAULT_POOLSIZE)
+            credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+            session = AuthorizedSession(credentials)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            _storage_client = storage.Client(project=project, credentials=credentials, _http=session)
+    return _storage_client
+
+
+def get_bucket(bucket_name):
+    """Returns the GCS bucket, or its local stand-in when GCS_LOCAL_DIR is set."""
+    if LOCAL_BUCKET_DIR:
+        return LocalBucket(os.path.join(LOCAL_BUCKET_DIR, bucket_name))
+    return get_storage_client().bucket(bucket_name)
+
+
+def get_csv_from_gcs(bucket_name, source_blob_name, header=None):
+    """Downloads a blob from the bucket (cached locally as Parquet until the blob changes)."""
+    bucket = get_bucket(bucket_name)
+    parse = lambda data: pd.read_csv(StringIO(data.decode("utf-8")), header=header)
+    return cached_frame(bucket, source_blob_name, parse, key=f"csv-h{header}")
+
+
+def get_xlsx_from_gcs(bucket_name, source_blob_name, header=None):
+    """Downloads a blob from the bucket (cached locally as Parquet until the blob changes)."""
+    bucket = get_bucket(bucket_name)
+    parse = lambda data: pd.read_excel(BytesIO(data), header=header)
+    return cached_frame(bucket, source_blob_name, parse, key=f"xlsx-h{header}")
+
+
+def prefetch_blobs(bucket_name, blobs):
+    """Downloads several blobs concurrently and returns their DataFrames in the same order.
+
+    `blobs` is a list of (source_blob_name, header) pairs; .xlsx blobs are read as Excel,
+    everything else as CSV.
+    """
+    def fetch(spec):
+        source_blob_name, header = spec
+        if source_blob_name.endswith(".xlsx"):
+            return get_xlsx_from_gcs(bucket_name, source_blob_name, header=header)
+        return get_csv_from_gcs(bucket_name, source_blob_name, header=header)
+
+    if len(blobs) <= 1:
+        return [fetch(spec) for spec in blobs]
+    with ThreadPoolExecutor(max_workers=min(GCS_DOWNLOAD_WORKERS, len(blobs))) as pool:
+        return list(pool.map(fetch, blobs))
+
+
+def list_blob_names(bucket_name, prefix):
+    """Names of the blobs under `prefix` (one directory level for the local stand-in)."""
+    return [blob.name for blob in get_bucket(bucket_name).list_blobs(prefix=prefix)]
+
+
+def open_blob(bucket_name, source_blob_name):
+    """Opens a blob for streaming reads (e.g. chunked pd.read_csv) without downloading it first."""
+    blob = get_bucket(bucket_name).get_blob(source_blob_name)
+    if blob is None:
+        raise FileNotFoundError(f"gs://{bucket_name}/{source_blob_name} does not exist")
+    return blob.open("rb")
+
+
+def dataset_location(bucket_name, prefix):
+    """Returns (pyarrow filesystem, path) for a prefix in the bucket or its local stand-in."""
+    if LOCAL_BUCKET_DIR:
+        return fs.LocalFileSystem(), os.path.join(LOCAL_BUCKET_DIR, bucket_name, prefix)
+    return fs.GcsFileSystem(), f"{bucket_name}/{prefix}"
+
+
+def read_parquet_from_gcs(bucket_name, prefix, columns=None, filters=None, partitioning="hive"):
+    """Reads a Parquet file or hive-partitioned dataset with column and predicate pushdown.
+
+    `filters` uses the pandas/pyarrow form, e.g. [('region', '==', 'Pacific'), ('year', '>=', 2021)];
+    partitions that can't match are never listed or opened, and only `columns` are read.
+    `partitioning` may be the dataset's own pyarrow partitioning instead of inferring it.
+    """
+    filesystem, path = dataset_location(bucket_name, prefix)
+    dataset = ds.dataset(path, filesystem=filesystem, format="parquet", partitioning=partitioning)
+    expression = pq.filters_to_expression(filters) if filters else None
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
@@ -0,0 +1,110 @@
+"""Linear vs exponential growth fits for many monthly series at once.
+
+Vectorized version of the notebooks' per-metro loop (two LinearRegression fits per series on
+`Timestamp.toordinal` days, then `coef * 30.44 / mean` and `exp(coef * 30.44) - 1` monthly growth).
+All series are laid out in one padded (series x month) matrix and fitted with closed-form least
+squares, so thousands of (metro, metric) series cost a handful of NumPy operations.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import ev_aggregates
+from evvsgas_data import ARTIFACT_DIR
+
+GROWTH_PATH = os.path.join(ARTIFACT_DIR, "metro_growth.parquet")
+
+DAYS_PER_MONTH = 30.44
+# Same offset the notebooks use to avoid log(0)
+LOG_OFFSET = 1e-6
+MIN_POINTS = 3
+
+
+def _weighted_line(x, y, mask):
+    """Per-row least-squares slope/intercept of y on x over the masked-in points."""
+    w = mask.astype(float)
+    y = np.where(mask, y, 0.0)
+    n = w.sum(axis=1)
+    sx = (w * x).sum(axis=1)
+    sy = y.sum(axis=1)
+    sxx = (w * x * x).sum(axis=1)
+    sxy = (y * x).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        intercept = (sy - slope * sx) / n
+    return slope, intercept
+
+
+def _r2(y, pred, mask):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(mask, y, 0.0).sum(axis=1) / mask.sum(axis=1)
+        ss_res = np.where(mask, (y - pred) ** 2, 0.0).sum(axis=1)
+        ss_tot = np.where(mask, (y - mean[:, None]) ** 2, 0.0).sum(axis=1)
+        return 1 - ss_res / ss_tot, mean
+
+
+def fit_growth(values, days):
+    """Fits both trends to every row of `values` (series x months, NaN where unobserved).
+
+    `days` holds the ordinal day of each month column. Returns a dict of per-series arrays.
+    """
+    values = np.asarray(values, dtype=float)
+    mask = ~np.isnan(values)
+    # Centering the ordinals keeps the sums well conditioned
+    x = (np.asarray(days, dtype=float) - np.min(days))[None, :]
+
+    slope, intercept = _weighted_line(x, values, mask)
+    linear_r2, mean = _r2(values, intercept[:, None] + slope[:, None] * x, mask)
+
+    log_values = np.log(np.where(mask, values, 1.0) + LOG_OFFSET)
+    exp_slope, exp_intercept = _weighted_line(x, log_values, mask)
+    exp_pred = np.exp(exp_intercept[:, None] + exp_slope[:, None] * x)
+    exp_r2, _ = _r2(values, exp_pred, mask)
+
+    n_points = mask.sum(axis=1)
+    too_short = n_points < MIN_POINTS
+    result = {
+        'n_months': n_points,
+        'linear_r2': linear_r2,
+        'linear_growth_pct': slope * DAYS_PER_MONTH / mean * 100,
+        'exp_r2': exp_r2,
+        'exp_growth_pct': (np.exp(exp_slope * DAYS_PER_MONTH) - 1) * 100,
+    }
+    for name in result:
+        if name != 'n_months':
+            result[name] = np.where(too_short, np.nan, result[name])
+    return result
+
+
+def growth_table(df, keys, time='year_month', value='value'):
+    """Fits every series in a long frame (one row per series key and month).
+
+    Returns one row per series with n_months, linear/exponential r2 and monthly growth %,
+    and `trend`, the better-fitting model ('linear' or 'exponential').
+    """
+    keys = list(keys)
+    series = df.groupby(keys, observed=True, sort=True).ngroup().to_numpy()
+    month_codes, months = pd.factorize(df[time], sort=True)
+
+    values = np.full((series.max() + 1 if len(series) else 0, len(months)), np.nan)
+    values[series, month_codes] = df[value].to_numpy(dtype=float)
+    days = np.array([pd.Timestamp(m).toordinal() for m in months], dtype=float)
+
+    fitted = fit_growth(values, days) if len(values) else {}
+    table = df[keys].drop_duplicates().sort_values(keys).reset_index(drop=True)
+    for name, column in fitted.items():
+        table[name] = column
+    if len(table):
+        table['trend'] = np.where(table['exp_r2'] > table['linear_r2'], 'exponential', 'linear')
+        table.loc[table['n_months'] < MIN_POINTS, 'trend'] = None
+    return table
+
+
+def metro_growth(cube, metrics=('sessions', 'energy_kwh'), regions=None, exclude=('Undesignated',)):
+    """Growth fits for every (region, metro_area, metric) series in the session cube."""
+    monthly = ev_aggregates.summarize(cube, by=['region', 'metro_area', 'year_month'], regions=regions)
+    monthly = monthly[~monthly['metro_area'].isin(exclude)]
+    long = monthly.melt(id_vars=['region', 'metro_area', 'year_month'], value_vars=list(metrics),
+                        var_name='metric', value_name='value')
+    return growth_table(long, ['region', 'metro_area', 'metric'])
@@ -0,0 +1,10 @@
+# gunicorn settings (picked up automatically from the working directory)
+import os
+
+
+def post_worker_init(worker):
+    # The worker is about to start accepting requests; build the lazy pages in the background
+    # so the first visitor to a data-heavy page doesn't pay for it. Set WARM_UP_PAGES=0 to skip.
+    if os.environ.get("WARM_UP_PAGES", "1") == "1":
+        from lazy_init import start_warm_up
+        start_warm_up(delay=float(os.environ.get("WARM_UP_DELAY", "1")))
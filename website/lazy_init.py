@@ -0,0 +1,57 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+_registry = []
+
+
+class LazyInit:
+    """Runs `build` once, on first use, however many threads ask for it at the same time.
+
+    If `build` raises, nothing is stored and the next caller tries again.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self._build = build
+        self._value = _UNSET
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    @property
+    def ready(self):
+        return self._value is not _UNSET
+
+    def get(self):
+        if self._value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    start = time.perf_counter()
+                    self._value = self._build()
+                    logger.info("Initialized %s in %.2fs", self.name, time.perf_counter() - start)
+        return self._value
+
+
+def warm_up():
+    """Builds every registered LazyInit that hasn't been used yet."""
+    for lazy in list(_registry):
+        if lazy.ready:
+            continue
+        try:
+            lazy.get()
+        except Exception:
+            logger.exception("Warm-up of %s failed; it will be retried on first request", lazy.name)
+
+
+def start_warm_up(delay=0.0):
+    """Runs warm_up() on a daemon thread after `delay` seconds, leaving the worker free to serve."""
+    def run():
+        time.sleep(delay)
+        warm_up()
+
+    thread = threading.Thread(target=run, name="page-warm-up", daemon=True)
+    thread.start()
+    return thread
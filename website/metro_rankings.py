@@ -0,0 +1,144 @@
+"""Per-region rankings of metros by sessions, energy and growth rate, updated incrementally.
+
+Replaces the notebooks' `value_counts().head(5)` over the full session table. For every
+(region, metro) the index keeps additive monthly statistics: session and energy totals and
+the sums the log-linear trend fit of growth_models needs, so its growth rates match
+metro_growth's `exp_growth_pct`. Each update reads only the cube rows from the last settled
+month on (a Parquet filter), folds the months that are now complete into the settled sums,
+and keeps the latest, possibly partial, month out of them until the next update:
+
+    from metro_rankings import top_metros
+    top_metros('Pacific', by='sessions', k=5)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from ev_aggregates import CUBE_PATH
+from evvsgas_data import ARTIFACT_DIR
+from growth_models import DAYS_PER_MONTH, LOG_OFFSET, MIN_POINTS
+from lazy_init import LazyInit
+from session_series import ALL
+
+RANKINGS_PATH = os.path.join(ARTIFACT_DIR, "metro_rankings.parquet")
+
+METRICS = ('sessions', 'energy_kwh')
+RANK_BY = ('sessions', 'energy_kwh', 'sessions_growth_pct', 'energy_kwh_growth_pct')
+# Sessions without a metro, left out of the notebooks' location rankings too
+EXCLUDE = ('Undesignated',)
+DEFAULT_K = 5
+
+KEYS = ['region', 'metro_area']
+# Days from a fixed origin keep the regression sums comparable across updates
+ORIGIN = pd.Timestamp('2000-01-01').toordinal()
+STATS = ['months', 'x', 'xx'] + [f'{s}_{m}' for m in METRICS for s in ('total', 'log', 'xlog')]
+
+
+def month_stats(monthly):
+    """Additive statistics per (region, metro) of a frame with one row per metro and month."""
+    x = np.array([t.toordinal() for t in monthly['year_month']], dtype=float) - ORIGIN
+    parts = {'months': np.ones(len(monthly)), 'x': x, 'xx': x * x}
+    for metric in METRICS:
+        values = monthly[metric].to_numpy(dtype=float)
+        log_values = np.log(values + LOG_OFFSET)
+        parts[f'total_{metric}'] = values
+        parts[f'log_{metric}'] = log_values
+        parts[f'xlog_{metric}'] = x * log_values
+    frame = pd.DataFrame(parts, index=pd.MultiIndex.from_frame(monthly[KEYS]))
+    return frame.groupby(level=KEYS).sum()
+
+
+def _growth_pct(stats, metric):
+    n, sx, sxx = stats['months'], stats['x'], stats['xx']
+    sy, sxy = stats[f'log_{metric}'], stats[f'xlog_{metric}']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    return ((np.exp(slope * DAYS_PER_MONTH) - 1) * 100).where(n >= MIN_POINTS)
+
+
+def rank_table(stats):
+    """Totals, monthly growth % and within-region ranks (1 = top) from the statistics."""
+    table = pd.DataFrame(index=stats.index)
+    table['months'] = stats['months'].astype(int)
+    for metric in METRICS:
+        table[metric] = stats[f'total_{metric}']
+        table[f'{metric}_growth_pct'] = _growth_pct(stats, metric)
+    table = table.reset_index()
+    for by in RANK_BY:
+        table[f'rank_{by}'] = table.groupby('region')[by].rank(ascending=False, method='first')
+    return table
+
+
+def _monthly(cube_path, since, exclude):
+    filters = [('year_month', '>=', since)] if since is not None else None
+    cube = pd.read_parquet(cube_path, columns=['year_month'] + KEYS + list(METRICS), filters=filters)
+    cube = cube[~cube['metro_area'].isin(exclude)].astype({c: str for c in KEYS})
+    return cube.groupby(KEYS + ['year_month'])[list(METRICS)].sum().reset_index()
+
+
+def update_rankings(cube_path=CUBE_PATH, path=RANKINGS_PATH, full=False, exclude=EXCLUDE):
+    """Folds the cube's months since the last update into the stored index; returns the table.
+
+    Run after ev_aggregates.update_cube (the sessions step does); pass `full` whenever the
+    cube itself was rebuilt.
+    """
+    stored = None if full else load_rankings(path)
+    since = pd.Timestamp(stored.attrs['settled_before']) if stored is not None else None
+    monthly = _monthly(cube_path, since, exclude)
+    if not len(monthly):
+        return stored
+
+    latest = monthly['year_month'].max()
+    settled = month_stats(monthly[monthly['year_month'] < latest])
+    if stored is not None:
+        previous = stored.set_index(KEYS)[[f'settled_{s}' for s in STATS]]
+        settled = settled.add(previous.rename(columns=lambda c: c[len('settled_'):]), fill_value=0)
+    current = settled.add(month_stats(monthly[monthly['year_month'] == latest]), fill_value=0)
+
+    table = rank_table(current)
+    settled = settled.reindex(pd.MultiIndex.from_frame(table[KEYS]), fill_value=0)
+    for column in STATS:
+        table[f'settled_{column}'] = settled[column].to_numpy()
+    table.attrs['settled_before'] = latest.strftime('%Y-%m-%d')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    table.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return table
+
+
+def load_rankings(path=RANKINGS_PATH):
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+class Rankings:
+    """Metro names ordered by each ranking, per region and across all regions."""
+
+    def __init__(self, table):
+        self.order = {}
+        for by in RANK_BY:
+            ranked = table.dropna(subset=[by]).sort_values(by, ascending=False, kind='stable')
+            self.order[(ALL, by)] = list(dict.fromkeys(ranked['metro_area']))
+            for region, rows in ranked.groupby('region', sort=False):
+                self.order[(region, by)] = list(rows['metro_area'])
+
+    def top(self, region=ALL, by='sessions', k=DEFAULT_K):
+        return self.order.get((region, by), [])[:k]
+
+
+def _load():
+    table = load_rankings()
+    return Rankings(table) if table is not None else None
+
+
+rankings = LazyInit("metro rankings", _load)
+
+
+def top_metros(region=ALL, by='sessions', k=DEFAULT_K):
+    """The top `k` metros of `region` by one of RANK_BY; empty until the index is built."""
+    index = rankings.get()
+    return index.top(region, by, k) if index is not None else []
@@ -1,142 +1,138 @@
 # pages/findings.py
-from dash import html, dcc
-from app import dash
-
-dash.register_page(__name__, path="/findings")
-
-layout = html.Div(className="page-container findings-page", children=[
-
-    # Page title
-    html.H2("Major Findings for EV Growth", className="section-title"),
-
-    # 1) EV Sales (IEA)
-    html.Div(className="findings-section", children=[
-        html.H3("EV Sales in USA (IEA)", className="subsection-title"),
-        html.Div(className="media-wrapper", children=[
-            html.Img(
-                src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results/ev_sales.png",
-                className="full-image"
-            ),
-            html.Div(className="findings-text", children=[
-                "In this plot generated by ",
-                html.A(
-                    "IEA",
-                    href="https://www.iea.org/data-and-statistics/data-tools/global-ev-data-explorer",
-                    target="_blank",
-                    className="source-link"
-                ),
-                ", we used linear regression model to test if linear or exponential, and found that the "
-                "trend for EV sales in the USA is exponential with a r2 score of 0.875 compared to linear of 0.714. "
-                "The annual growth rate was 46.8% a year or 3.25% a month"
-            ])
-        ])
-    ]),
-
-    # 2) US EV Energy History
-html.Div(className="findings-section", children=[
-
-    # Section subtitle + side-by-side panels
-    html.H3("United States EV Energy History", className="subsection-title"),
-    html.Div(className="media-wrapper", children=[
-        html.Img(
-            src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results/US_energy_usage_growth.png",
-            className="half-image"
-        ),
-        html.Img(
-            src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results/US_charging_session_growth.png",
-            className="half-image"
-        )
-    ]),
-    html.Div(className="findings-text", children=[
-        "Summary: The left plot shows energy usage history; the right plot shows charging session history. "
-        "Both charging session and energy usage are increasing linearly over time for all regions combined in the USA. "
-        "The monthly growth rate of energy usage on avg is 5.45% per month, while the monthly growth for charging sessions is 4.88%."
-    ]),
-]),
-    # 3) Pacific region analysis
-    html.Div(className="findings-section", children=[
-
-        html.H3("Further Analysis With Focus on the Pacific Region", className="subsection-title"),
-        # Centered Info line, tight to the chart
-        html.P(
-            "(Info: History of charging sessions and energy usage in the Pacific region.)",
-            className="info-text"
-        ),
-        html.Div(className="media-wrapper", children=[
-        html.Img(
-            src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results/Pacific_energy_usage_growth.png",
-            className="half-image"
-        ),
-        html.Img(
-            src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results/Pacific_charging_session_growth.png",
-            className="half-image"
-        )
-    ]),
-        # Summary text
-        html.Div(className="findings-text", children=[
-            "Summary: This plot focuses on comparing charging sessions and energy usage in the Pacific region. "
-            "Something interesting we found, is that the pacific region has an exponential growth rate, where the exponential "
-            "model fitted better than linear with a r2 score of 0.952 for energy usage and 0.904 for sessions. This suggest that the pacific region "
-            "is experiencing exponential growth in usage and sessions. While the monthly growth rates we got for charging sessions was approximately "
-            "3.86% and 4.37% for energy usage on avg."
-        ])
-    ]),
-
+import importlib
 
-    # 4) Popular charging locations
-html.Div(className="findings-section", children=[
-
-    html.H3("Popular Charging Locations in the Pacific Region", className="subsection-title"),
-
-    # 4a) Top locations bar chart
-    html.Div(className="media-wrapper", children=[
-        html.Img(
-            src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results/pacific_popular_locations.png",
-            className="full-image"
-        )
-    ]),
-    html.P(
-        "(Info: Charging session counts by location.)",
-        className="info-text"
-    ),
-    html.Div(className="findings-text", children=[
-        "Summary: This plot shows the top charging locations in the pacific region. "
-        "We can see that over time, Portland-Vancouver-Hillsboro is the most popular location, "
-        "comparing the growth rates, we found that Portland-Vancouver-Hillsboro, Seatle-Tacoma-Bellevue, and Salem has "
-        "exponential trend, while Los Angeles-Long Beach-Anaheim has a linear trend. Avg monthly growth rates in the plot."
-    ]),
-
-    # 4b) Heatmap of top areas
-    html.Div(className="media-wrapper", children=[
-        html.Img(
-            src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/april29-results/OR_WA_heatmap.png",
-            className="full-image"
-        )
-    ]),
-    html.P(
-        "(Info: Heatmap visualization of growth.)",
-        className="info-text"
-    ),
-    html.Div(className="findings-text", children=[
-        "Summary: The heatmap is just used as another visualization to show growth, here we chose the top location. "
-        "The heatmap focuses on Portland-Vancouver-Hillsboro, which are areas in Oregon and Washington. "
-        "Y-axis is YYYY-MM, and x-axis is location, we see that around the end of 2021, the growth rate begins to increase significantly. "
-        "This area had exponential growth with a fit of 0.86 r2 score, and avg monthly growth rate of 4.8%"
-    ])
-
-]),
-
-
-    # 5) Overall summary
-    html.Div(className="findings-section", children=[
-        html.H3("Summary", className="subsection-title"),
-        html.Div(className="findings-text", children=[
-            "From these analysis and visualizations, we can see that both energy usage and charging "
-           "sessions is increasing over time. We can see that energy usage is being consumed at almost "
-           "exponential rate in the pacific region compared to linear overall in the USA. While focusing " 
-           "on the Pacific region, we can see that the most popular charging locations are around Oregon and Washington. "
-           "The next step now would be to analyze the difference between Electric and Gas, and predict future trends."
-        ])
-    ]),
-
-])
+import numpy as np
+from dash import Patch
+from dash.dependencies import Input, Output, State
+from app import dash
+from lazy_init import LazyInit
+
+TOP_LOCATIONS = 5
+
+# Data, figures and layout live in findings_page, imported on first use rather than at startup
+content = LazyInit("findings", lambda: importlib.import_module("findings_page"))
+
+def layout(**kwargs):
+    return content.get().layout
+
+dash.register_page(__name__, path="/findings", layout=layout)
+
+
+# The charts fetch their series straight from /api/series, so switching region, metro or
+# resolution never goes through a Dash callback on the server
+_SERIES_LABEL = """
+    function seriesLabel(region, metro) {
+        if (metro && metro !== 'All') { return metro; }
+        return region === 'All' ? 'United States' : region;
+    }
+"""
+_FETCH_SERIES = """
+    function fetchSeries(spec, region, metro, resolution) {
+        var params = new URLSearchParams({region: region, metro: metro, metric: spec.metric,
+                                          resolution: resolution, points: spec.points});
+        return fetch(spec.url + '?' + params).then(function (response) {
+            return response.ok ? response.json() : {x: [], y: []};
+        });
+    }
+"""
+
+def metro_options_callback(prefix, multi, options_id, top=TOP_LOCATIONS, ranked=False):
+    """Metro choices follow the selected region. Multi-metro charts keep the selected metros
+    that are in the new region and otherwise take its top metros; picking a ranking always does."""
+    rank_input = [Input(f"{prefix}-rank", "value")] if ranked else []
+    dash.clientside_callback(
+        """
+        function(region) {
+            var args = Array.prototype.slice.call(arguments);
+            var multi = %s, ranked = %s;
+            var rankBy = ranked ? args[1] : 'sessions';
+            var metro = args[args.length - 2];
+            var choices = args[args.length - 1][region] || {names: [], top: {}};
+            var names = choices.names;
+            var options = names.map(function (n) { return {label: n, value: n}; });
+            if (multi) {
+                var reranked = dash_clientside.callback_context.triggered.some(function (t) {
+                    return t.prop_id.indexOf('-rank.') >= 0;
+                });
+                var kept = (metro || []).filter(function (m) { return names.indexOf(m) >= 0; });
+                return [options, kept.length && !reranked ? kept : (choices.top[rankBy] || []).slice(0, %d)];
+            }
+            return [[{label: 'All metros', value: 'All'}].concat(options),
+                    names.indexOf(metro) >= 0 ? metro : 'All'];
+        }
+        """ % ('true' if multi else 'false', 'true' if ranked else 'false', top),
+        Output(f"{prefix}-metro", "options"),
+        Output(f"{prefix}-metro", "value"),
+        Input(f"{prefix}-region", "value"),
+        *rank_input,
+        State(f"{prefix}-metro", "value"),
+        State(options_id, "data"),
+        prevent_initial_call=True,
+    )
+
+
+# Registered whether or not the data has been built: the page only renders the live charts'
+# components when it has, and callbacks for components that aren't on the page never fire
+for prefix, multi, ranked in (("us-energy", False, False), ("pacific-sessions", False, False),
+                              ("pacific-locations", True, True)):
+    metro_options_callback(prefix, multi, "findings-metro-options", ranked=ranked)
+
+for prefix in ("us-energy", "pacific-sessions"):
+    dash.clientside_callback(
+        """
+        async function(region, metro, resolution, spec) {
+""" + _SERIES_LABEL + _FETCH_SERIES + """
+            var data = await fetchSeries(spec, region, metro, resolution);
+            var layout = Object.assign({}, spec.figure.layout,
+                                       {title: {text: spec.title + ' \u2013 ' + seriesLabel(region, metro)}});
+            return {data: [{x: data.x, y: data.y, mode: 'lines', name: spec.title}], layout: layout};
+        }
+        """,
+        Output(f"{prefix}-graph", "figure"),
+        Input(f"{prefix}-region", "value"),
+        Input(f"{prefix}-metro", "value"),
+        Input(f"{prefix}-resolution", "value"),
+        State(f"{prefix}-spec", "data"),
+    )
+
+dash.clientside_callback(
+    """
+    async function(region, metros, resolution, spec) {
+""" + _SERIES_LABEL + _FETCH_SERIES + """
+        var traces = await Promise.all((metros || []).map(function (metro) {
+            return fetchSeries(spec, region, metro, resolution).then(function (data) {
+                return {x: data.x, y: data.y, mode: 'lines', name: metro};
+            });
+        }));
+        var layout = Object.assign({}, spec.figure.layout,
+                                   {title: {text: spec.title + ' \u2013 ' + seriesLabel(region, 'All')}});
+        return {data: traces, layout: layout};
+    }
+    """,
+    Output("pacific-locations-graph", "figure"),
+    Input("pacific-locations-region", "value"),
+    Input("pacific-locations-metro", "value"),
+    Input("pacific-locations-resolution", "value"),
+    State("pacific-locations-spec", "data"),
+)
+
+
+metro_options_callback("metro-heatmap", True, "heatmap-metro-options", top=1)
+
+@dash.callback(
+    Output("metro-heatmap-graph", "figure"),
+    Input("metro-heatmap-region", "value"),
+    Input("metro-heatmap-metro", "value"),
+    Input("metro-heatmap-metric", "value"),
+    prevent_initial_call=True,
+)
+def update_metro_heatmap(region, metros, metric):
+    page = content.get()
+    # Only the selected metros' rows of the memory-mapped matrix are read
+    found, z = page.heatmap.cells(metros or [], metric, region)
+    fig = Patch()
+    fig["data"][0]["x"] = found
+    fig["data"][0]["z"] = np.round(z, 1).tolist()
+    fig["data"][0]["colorbar"]["title"]["text"] = page.HEATMAP_METRICS[metric]
+    fig["layout"]["title"]["text"] = page.heatmap_title(metric, region)
+    return fig
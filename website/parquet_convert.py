@@ -0,0 +1,116 @@
+"""Converts the raw CSV datasets in the bucket to typed Parquet under the `parquet/` prefix.
+
+The gas sheet's header rows, repeated `Date` lines and `%b-%Y` dates are cleaned up once here,
+and the session table is written as a hive-partitioned dataset (year / month / region) with the
+EVSE attributes already joined, so readers only touch the partitions and columns they need:
+
+    read_parquet_from_gcs(bucket, SESSIONS_PARQUET, columns=['year_month', 'energy_kwh'],
+                          filters=[('region', '==', 'Pacific')])
+
+Run with `python build_artifacts.py parquet`; `python build_artifacts.py sessions --from-parquet`
+then updates the session cube from this dataset (see read_sessions) instead of the CSVs.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from ev_ingest import DEFAULT_CHUNKSIZE, EvseLookup, iter_sessions
+from evvsgas_data import ELEC_BLOB, GAS_BLOB, clean_elec, clean_gas
+from gcs_cache import dataset_location, open_blob, prefetch_blobs, read_parquet_from_gcs
+
+SESSION_BLOB = 'data/evwatts.public.session.csv'
+EVSE_BLOB = 'data/evwatts.public.evse.csv'
+
+PARQUET_PREFIX = 'parquet'
+GAS_PARQUET = f'{PARQUET_PREFIX}/gas_prices.parquet'
+ELEC_PARQUET = f'{PARQUET_PREFIX}/electric_rates.parquet'
+EVSE_PARQUET = f'{PARQUET_PREFIX}/evse.parquet'
+SESSIONS_PARQUET = f'{PARQUET_PREFIX}/sessions'
+
+SESSION_COLUMNS = ['session_id', 'evse_id', 'start_datetime', 'year_month', 'energy_kwh',
+                   'charge_level', 'region', 'metro_area']
+SESSION_PARTITIONING = ds.partitioning(
+    pa.schema([('year', pa.int16()), ('month', pa.int8()), ('region', pa.string())]), flavor='hive'
+)
+
+
+def _write_table(bucket_name, blob_name, df):
+    filesystem, path = dataset_location(bucket_name, blob_name)
+    filesystem.create_dir(path.rsplit('/', 1)[0], recursive=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, filesystem=filesystem)
+
+
+def convert_prices(bucket_name):
+    """Writes the cleaned gas and electric price series (all years) as Parquet."""
+    gas_df, elec_df = prefetch_blobs(bucket_name, [(GAS_BLOB, 3), (ELEC_BLOB, 0)])
+    gas_df = clean_gas(gas_df, years=None)[['Date', 'Gas Price']]
+    elec_df = clean_elec(elec_df, years=None)[['Date', 'Electric Rate']]
+    _write_table(bucket_name, GAS_PARQUET, gas_df.reset_index(drop=True))
+    _write_table(bucket_name, ELEC_PARQUET, elec_df.reset_index(drop=True))
+    return len(gas_df), len(elec_df)
+
+
+def _partition_path(path, year, month, region):
+    key = ((pc.field('year') == pa.scalar(year, pa.int16()))
+           & (pc.field('month') == pa.scalar(month, pa.int8()))
+           & (pc.field('region').is_null() if pd.isna(region)
+              else pc.field('region') == pa.scalar(region, pa.string())))
+    directory, _ = SESSION_PARTITIONING.format(key)
+    return f'{path}/{directory}'
+
+
+def convert_sessions(bucket_name, chunksize=DEFAULT_CHUNKSIZE):
+    """Streams the session CSV from the bucket into the partitioned sessions dataset.
+
+    Each year/month/region partition gets a single file: its writer stays open while the
+    CSV streams past, and every chunk appends its rows for that partition as a row group
+    (the CSV is in time order, so a partition's rows mostly arrive in one or two chunks).
+    """
+    evse_df, = prefetch_blobs(bucket_name, [(EVSE_BLOB, 0)])
+    _write_table(bucket_name, EVSE_PARQUET, evse_df)
+
+    filesystem, path = dataset_location(bucket_name, SESSIONS_PARQUET)
+    # Start from an empty dataset so partitions from a previous run can't linger
+    filesystem.create_dir(path, recursive=True)
+    filesystem.delete_dir_contents(path)
+
+    rows = 0
+    writers = {}
+    try:
+        with open_blob(bucket_name, SESSION_BLOB) as source:
+            for chunk in iter_sessions(source, columns=SESSION_COLUMNS, chunksize=chunksize,
+                                       evse=EvseLookup(evse_df)):
+                keys = [chunk['year_month'].dt.year, chunk['year_month'].dt.month, chunk['region']]
+                for key, part in chunk.groupby(keys, observed=True, dropna=False, sort=False):
+                    table = pa.Table.from_pandas(part.drop(columns='region'), preserve_index=False)
+                    writer = writers.get(key)
+                    if writer is None:
+                        # A missing region goes to the hive null partition and reads back as NaN
+                        directory = _partition_path(path, *key)
+                        filesystem.create_dir(directory, recursive=True)
+                        writer = writers[key] = pq.ParquetWriter(
+                            f'{directory}/part-0.parquet', table.schema, filesystem=filesystem)
+                    writer.write_table(table)
+                rows += len(chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return rows
+
+
+def read_sessions(bucket_name, columns=SESSION_COLUMNS, since=None):
+    """Reads the converted sessions, touching only `columns` and the partitions from `since` on.
+
+    Returns the same frame as ev_ingest.read_sessions (region, metro_area and charge_level
+    categorical) without parsing the CSVs.
+    """
+    filters = None
+    if since is not None:
+        since = pd.Timestamp(since).to_period('M').to_timestamp()
+        filters = [('year', '>=', since.year), ('year_month', '>=', since)]
+    sessions = read_parquet_from_gcs(bucket_name, SESSIONS_PARQUET, columns=list(columns), filters=filters,
+                                     partitioning=SESSION_PARTITIONING)
+    categorical = [c for c in ('region', 'metro_area', 'charge_level') if c in sessions]
+    return sessions.astype({c: 'category' for c in categorical})
@@ -0,0 +1,84 @@
+from dash import dcc, html
+
+from backtest import describe as describe_backtest, load_metrics as load_backtest_metrics
+from forecast_charts import forecast_figure
+from forecasting import load_forecasts
+
+# Content of the /predictions page. pages/predictions.py imports this module on the first
+# visit to the route (or from the background warm-up), so reading the forecast table never
+# delays app startup.
+
+# Pacific energy forecast from `python build_artifacts.py forecasts`; the notebook PNG until it's built
+pacific_forecast = load_forecasts(filters=[
+    ('region', '==', 'Pacific'), ('metro_area', '==', 'All'), ('metric', '==', 'energy_kwh'),
+])
+if pacific_forecast is not None and len(pacific_forecast):
+    pacific_chart = dcc.Graph(
+        id="pacific-energy-forecast-graph",
+        figure=forecast_figure(pacific_forecast, "Forecast of EV Charging Energy Usage – Pacific Region",
+                               "Energy Usage (kWh)", color='orange'),
+        className="prediction-graph",
+    )
+else:
+    pacific_chart = html.Img(
+        src="https://storage.googleapis.com/evenergy163.appspot.com/new_results/pacific_results/pacific_prediction_energy.png",
+        className="prediction-image"
+    )
+
+layout = html.Div(className="page-container predictions-page", children=[
+
+    # 1) Page title
+    html.H2("Future Electric Predictions", className="section-title",style={"color": "#000000"}),
+
+    # 2) Intro paragraph
+    html.Div(className="predictions-intro", children=[
+        html.P(
+            "The dataset had a total of 39 months, which means that we can do a forecasting of "
+            "energy usage for the next year. The data also had a p-value of 0.993, which means the "
+            "data is not stationary. For this forecasting, we also used Meta's Prophet, which handles "
+            "non-stationary data.",
+            className="content-text"
+        )
+    ]),
+
+    # 3) Chart + Info + Summary in a responsive grid
+    html.Div(className="predictions-grid", children=[
+
+        # 3a) Left column: chart + info line
+        html.Div(className="predictions-chart-block", children=[
+            pacific_chart,
+            html.P(
+                "(Info: Forecast of energy usage for the Pacific region.)",
+                className="info-text"
+            ),
+            html.P(
+                describe_backtest(load_backtest_metrics(), 'pacific_energy', '{:,.0f} kWh'),
+                className="info-text"
+            ),
+        ]),
+
+        # 3b) Right column: chart summary
+        html.Div(className="predictions-summary-block", children=[
+            html.P(
+                "Summary: This plot shows the future electric predictions for the Pacific region. "
+                "The yellow dotted line represents the predicted energy usage, while the blue line "
+                "represents the actual energy usage from the past. Here we can see that the model is "
+                "predicting an upward trend.",
+                className="content-text"
+            )
+        ])
+    ]),
+
+    # 4) Final summary heading
+    html.H3("Summary", className="subsection-title"),
+
+    # 5) Final summary text
+    html.Div(className="content-text", children=[
+        "Though we lack the data to analyze actual impact to the energy infrastructure, our analysis "
+        "of the past, and the predictions suggest strong growth in EV adoption, and energy usage. "
+        "Therefore based on the data and strong evidence of consistent upward trends we can infer that "
+        "the upward trend suggests a growing pressure on the infrastructure and grid, which highlights "
+        "the need for proactive planning to support future EV demands."
+    ])
+
+])
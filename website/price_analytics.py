@@ -0,0 +1,87 @@
+"""Rolling and lagged statistics for the merged gas / electric price series.
+
+Every rolling statistic is computed from running (cumulative) sums, so a window costs O(n)
+whatever its length, and a whole set of windows is one (windows x n) array operation.
+Cross-correlations for all lags come from one FFT plus running sums for the overlapping
+segments' means and variances.
+"""
+import numpy as np
+
+
+def _prefix(values):
+    """Cumulative sums with a leading zero, so window sums are prefix[i + w] - prefix[i]."""
+    return np.concatenate([[0.0], np.cumsum(values)])
+
+
+def _window_sums(prefix, windows, n):
+    """(len(windows), n) matrix of trailing-window sums ending at each index (NaN until full)."""
+    windows = np.atleast_1d(np.asarray(windows, dtype=int))
+    end = np.arange(1, n + 1)
+    start = end[None, :] - windows[:, None]
+    valid = start >= 0
+    sums = prefix[end][None, :] - prefix[np.clip(start, 0, None)]
+    return np.where(valid, sums, np.nan), windows
+
+
+def rolling_std(x, windows):
+    """Sample standard deviation over trailing windows; one row per window (a 1-D result for an int)."""
+    x = np.asarray(x, dtype=float)
+    # Centering first keeps the sum-of-squares difference from cancelling catastrophically
+    x = x - x.mean()
+    s1, w = _window_sums(_prefix(x), windows, len(x))
+    s2, _ = _window_sums(_prefix(x * x), windows, len(x))
+    w = w[:, None].astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (s2 - s1 * s1 / w) / (w - 1)
+    std = np.sqrt(np.maximum(var, 0))
+    return std[0] if np.ndim(windows) == 0 else std
+
+
+def rolling_corr(x, y, windows):
+    """Pearson correlation of x and y over trailing windows; one row per window (1-D for an int)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x = x - x.mean()
+    y = y - y.mean()
+    n = len(x)
+    sx, w = _window_sums(_prefix(x), windows, n)
+    sy, _ = _window_sums(_prefix(y), windows, n)
+    sxx, _ = _window_sums(_prefix(x * x), windows, n)
+    syy, _ = _window_sums(_prefix(y * y), windows, n)
+    sxy, _ = _window_sums(_prefix(x * y), windows, n)
+    w = w[:, None].astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / w
+        corr = cov / np.sqrt((sxx - sx * sx / w) * (syy - sy * sy / w))
+    corr = np.clip(corr, -1, 1)
+    return corr[0] if np.ndim(windows) == 0 else corr
+
+
+def cross_correlation(x, y, max_lag):
+    """Pearson correlation of x[t] with y[t + lag] for lag in -max_lag..max_lag.
+
+    Returns (lags, corr). A positive lag means y follows x by that many steps.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    max_lag = min(int(max_lag), n - 2)
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    # All lagged cross products sum(x[t] * y[t + lag]) at once
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    products = np.fft.irfft(np.conj(np.fft.rfft(x, size)) * np.fft.rfft(y, size), size)
+    sxy = products[lags % size]
+
+    # x[a:b] and y[a + lag:b + lag] overlap; their sums come from prefix sums
+    x_start = np.maximum(0, -lags)
+    x_end = n - np.maximum(0, lags)
+    y_start = x_start + lags
+    y_end = x_end + lags
+    m = (x_end - x_start).astype(float)
+    px, pxx, py, pyy = _prefix(x), _prefix(x * x), _prefix(y), _prefix(y * y)
+    sx, sxx = px[x_end] - px[x_start], pxx[x_end] - pxx[x_start]
+    sy, syy = py[y_end] - py[y_start], pyy[y_end] - pyy[y_start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (sxy - sx * sy / m) / np.sqrt((sxx - sx * sx / m) * (syy - sy * sy / m))
+    return lags, np.clip(corr, -1, 1)
@@ -0,0 +1,123 @@
+"""Gas prices and many regions' electric rates as one month x series array.
+
+The EVvsGas page used to pd.merge a single electric rate sheet with the gas series on
+YearMonth. Here every price series lives in one float array with a row per month and a
+column per series (the U.S. gas price, each region's electric rate and, with bundled CPI
+data, the constant-dollar factor), NaN where a series has no value. A month's row is its
+YearMonth as an integer offset (year * 12 + month - 1) from the first month, so aligning a
+region with gas or looking up months is array indexing rather than a merge.
+
+Every `data/<Region> Electric Rates.csv` in the bucket (in the California sheet's
+Date / Value (USD/kWh) format) becomes a region. The `evvsgas` build step writes the panel
+next to the other artifacts as a memory-mapped .npy array plus a JSON index.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cpi import cpi_factors
+from evvsgas_data import ARTIFACT_DIR, load_array, save_array
+
+PANEL_PATH = os.path.join(ARTIFACT_DIR, "price_panel.npy")
+PANEL_INDEX_PATH = os.path.join(ARTIFACT_DIR, "price_panel.json")
+
+RATE_PREFIX = 'data/'
+RATE_SUFFIX = ' Electric Rates.csv'
+DEFAULT_REGION = 'California'
+GAS_SERIES = 'Gas Price'
+CPI_SERIES = 'CPI Factor'
+
+
+def month_offset(dates):
+    """YearMonth of each date as the integer year * 12 + month - 1."""
+    stamps = pd.DatetimeIndex(pd.to_datetime(dates))
+    return (stamps.year * 12 + stamps.month - 1).to_numpy()
+
+
+def rate_blobs(blob_names):
+    """{region: blob name} for the electric rate sheets among `blob_names`."""
+    return {name[len(RATE_PREFIX):-len(RATE_SUFFIX)]: name for name in blob_names
+            if name.startswith(RATE_PREFIX) and name.endswith(RATE_SUFFIX)}
+
+
+def build_panel(gas_df, rates, cpi=None, cpi_base_year=None):
+    """(values, index) from a cleaned gas sheet and {region: cleaned electric sheet}.
+
+    The sheets are the output of evvsgas_data.clean_gas / clean_elec.
+    """
+    columns = {GAS_SERIES: (gas_df['Date'], gas_df['Gas Price'])}
+    for region, elec_df in sorted(rates.items()):
+        columns[region] = (elec_df['Date'], elec_df['Electric Rate'])
+
+    offsets = {name: month_offset(dates) for name, (dates, _) in columns.items()}
+    start = min(o.min() for o in offsets.values())
+    months = max(o.max() for o in offsets.values()) - start + 1
+    names = list(columns) + ([CPI_SERIES] if cpi is not None and len(cpi) else [])
+    values = np.full((months, len(names)), np.nan)
+    for j, (name, (_, prices)) in enumerate(columns.items()):
+        values[offsets[name] - start, j] = pd.to_numeric(prices, errors='coerce').to_numpy(dtype=float)
+
+    month_starts = pd.period_range(pd.Period(year=start // 12, month=start % 12 + 1, freq='M'),
+                                   periods=months, freq='M').to_timestamp()
+    if CPI_SERIES in names:
+        values[:, -1], cpi_base_year = cpi_factors(month_starts, cpi, cpi_base_year)
+
+    index = {
+        'start': month_starts[0].strftime('%Y-%m'),
+        'months': int(months),
+        'series': names,
+        'cpi_base_year': cpi_base_year,
+    }
+    return values, index
+
+
+def save_panel(values, index, path=PANEL_PATH, index_path=PANEL_INDEX_PATH):
+    save_array(values, index, path, index_path)
+
+
+class PricePanel:
+    """The month x series price array with name -> column and YearMonth -> row lookups."""
+
+    def __init__(self, values, index):
+        self.values = values
+        self.months = pd.period_range(index['start'], periods=index['months'], freq='M').to_timestamp()
+        self.columns = {name: j for j, name in enumerate(index['series'])}
+        self.cpi_base_year = index.get('cpi_base_year')
+        self.regions = [name for name in index['series'] if name not in (GAS_SERIES, CPI_SERIES)]
+
+    @classmethod
+    def load(cls, path=PANEL_PATH, index_path=PANEL_INDEX_PATH):
+        stored = load_array(path, index_path)
+        return cls(*stored) if stored is not None else None
+
+    @classmethod
+    def from_merged(cls, merged_df, region=DEFAULT_REGION, cpi_base_year=None):
+        """A one-region panel from the EVvsGas merged frame, for when no panel was built."""
+        offsets = month_offset(merged_df['Date'])
+        start = offsets.min()
+        sources = {GAS_SERIES: 'Gas Price', region: 'Electric Rate'}
+        if CPI_SERIES in merged_df:
+            sources[CPI_SERIES] = CPI_SERIES
+        names = list(sources)
+        values = np.full((offsets.max() - start + 1, len(names)), np.nan)
+        for j, column in enumerate(sources.values()):
+            values[offsets - start, j] = merged_df[column].to_numpy(dtype=float)
+        first = merged_df['Date'].min()
+        return cls(values, {'start': f"{first:%Y-%m}", 'months': len(values), 'series': names,
+                            'cpi_base_year': cpi_base_year})
+
+    @property
+    def has_cpi(self):
+        return CPI_SERIES in self.columns
+
+    def series(self, name):
+        return self.values[:, self.columns[name]]
+
+    def aligned(self, region):
+        """(month starts, gas, electric, CPI factors or None) for the months both prices cover."""
+        gas = self.series(GAS_SERIES)
+        elec = self.series(region)
+        rows = np.flatnonzero(~(np.isnan(gas) | np.isnan(elec)))
+        cpi = np.asarray(self.series(CPI_SERIES)[rows]) if self.has_cpi else None
+        return self.months[rows], np.asarray(gas[rows]), np.asarray(elec[rows]), cpi
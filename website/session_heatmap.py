@@ -0,0 +1,83 @@
+"""Dense month x metro matrices of sessions and energy for the findings page's heatmap.
+
+Built from the session cube by the sessions step and stored as one .npy array laid out
+(metric, metro, month), so each metro's months are contiguous, plus a JSON index of the
+months and of the (region, metro) behind each row. The page memory-maps the array, so
+picking metros reads only their rows and a lookup costs the number of cells selected,
+not the size of the matrix.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from evvsgas_data import ARTIFACT_DIR, load_array, save_array
+from session_series import ALL
+
+HEATMAP_PATH = os.path.join(ARTIFACT_DIR, "session_heatmap.npy")
+HEATMAP_INDEX_PATH = os.path.join(ARTIFACT_DIR, "session_heatmap.json")
+
+METRICS = ('sessions', 'energy_kwh')
+
+
+def build_heatmap(cube):
+    """(matrix, index) from the session cube; matrix[metric, row, month] as float32."""
+    cells = (cube.groupby(['region', 'metro_area', 'year_month'], observed=True)[list(METRICS)]
+             .sum().reset_index().astype({'region': str, 'metro_area': str}))
+    months = pd.date_range(cells['year_month'].min(), cells['year_month'].max(), freq='MS')
+    rows = pd.MultiIndex.from_frame(cells[['region', 'metro_area']]).unique().sort_values()
+
+    row = rows.get_indexer(pd.MultiIndex.from_frame(cells[['region', 'metro_area']]))
+    stamp = pd.DatetimeIndex(cells['year_month'])
+    month = (stamp.year - months[0].year) * 12 + stamp.month - months[0].month
+    matrix = np.zeros((len(METRICS), len(rows), len(months)), dtype=np.float32)
+    for k, metric in enumerate(METRICS):
+        matrix[k, row, month] = cells[metric].to_numpy(dtype=np.float32)
+
+    index = {
+        'start': months[0].strftime('%Y-%m'),
+        'months': len(months),
+        'metrics': list(METRICS),
+        'regions': list(rows.get_level_values(0)),
+        'metros': list(rows.get_level_values(1)),
+    }
+    return matrix, index
+
+
+def save_heatmap(matrix, index, path=HEATMAP_PATH, index_path=HEATMAP_INDEX_PATH):
+    save_array(matrix, index, path, index_path)
+
+
+class Heatmap:
+    """A memory-mapped heatmap matrix with (region, metro) -> row lookups."""
+
+    def __init__(self, matrix, index):
+        self.matrix = matrix
+        self.months = pd.period_range(index['start'], periods=index['months'], freq='M').strftime('%Y-%m')
+        self.metric_rows = {metric: k for k, metric in enumerate(index['metrics'])}
+        self.by_region = {ALL: {}}
+        for i, (region, metro) in enumerate(zip(index['regions'], index['metros'])):
+            self.by_region.setdefault(region, {})[metro] = [i]
+            # Without a region, a metro name covers its rows in every region
+            self.by_region[ALL].setdefault(metro, []).append(i)
+
+    @classmethod
+    def load(cls, path=HEATMAP_PATH, index_path=HEATMAP_INDEX_PATH):
+        stored = load_array(path, index_path)
+        return cls(*stored) if stored is not None else None
+
+    def region_names(self):
+        return sorted(set(self.by_region) - {ALL})
+
+    def metro_names(self, region=ALL):
+        return sorted(self.by_region.get(region, {}))
+
+    def cells(self, metros, metric='sessions', region=ALL):
+        """(metros found, months x metros array) of `metric` for the named metros of `region`."""
+        rows = self.by_region.get(region, {})
+        found = [m for m in metros if m in rows]
+        matrix = self.matrix[self.metric_rows[metric]]
+        z = np.empty((len(self.months), len(found)))
+        for j, metro in enumerate(found):
+            z[:, j] = matrix[rows[metro]].sum(axis=0)
+        return found, z
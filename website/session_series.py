@@ -0,0 +1,158 @@
+"""Session and energy time series for the findings charts, served as small JSON.
+
+The daily rollup from `python build_artifacts.py sessions` (ev_aggregates.DAILY_PATH) is held
+as dense day x (region, metro) matrices, so a series is a column sum plus a bucketed sum per
+resolution, and is then thinned with Largest-Triangle-Three-Buckets to the caller's point
+budget. A response is a few KB whatever the number of sessions behind it:
+
+    GET /api/series?region=Pacific&metro=All&metric=energy_kwh&resolution=week&points=600
+"""
+import flask
+import numpy as np
+import pandas as pd
+
+import ev_aggregates
+from lazy_init import LazyInit
+
+# Registered on app.server by app.py
+blueprint = flask.Blueprint("session_series", __name__)
+
+ALL = "All"
+METRICS = ('sessions', 'energy_kwh')
+RESOLUTIONS = ('day', 'week', 'month')
+DEFAULT_POINTS = 600
+MAX_POINTS = 5000
+DECIMALS = 3
+
+
+def lttb(x, y, threshold):
+    """Indices of the Largest-Triangle-Three-Buckets downsample of (x, y) to `threshold` points.
+
+    Keeps the first and last points and, from each bucket in between, the point forming the
+    largest triangle with the previously kept point and the next bucket's mean, which keeps
+    peaks and dips that evenly spaced sampling would drop.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        mean_x = x[end:next_end].mean()
+        mean_y = y[end:next_end].mean()
+        area = np.abs((x[previous] - mean_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (mean_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return keep
+
+
+class SeriesStore:
+    """Daily sessions and energy per (region, metro) as dense matrices with one row per day."""
+
+    def __init__(self, daily):
+        dates = pd.DatetimeIndex(daily['date']).normalize()
+        self.days = pd.date_range(dates.min(), dates.max(), freq='D')
+        pairs = daily['region'].astype(str) + '\x00' + daily['metro_area'].astype(str)
+        codes, uniques = pd.factorize(pairs, sort=True)
+        split = uniques.str.split('\x00')
+        self.regions = np.array([p[0] for p in split], dtype=object)
+        self.metros = np.array([p[1] for p in split], dtype=object)
+
+        rows = (dates - self.days[0]).days.to_numpy()
+        self.values = {}
+        for metric in METRICS:
+            matrix = np.zeros((len(self.days), len(uniques)))
+            np.add.at(matrix, (rows, codes), daily[metric].to_numpy(dtype=float))
+            self.values[metric] = matrix
+
+        # First row of every week (starting Monday) and month, for np.add.reduceat
+        self.buckets = {'day': (np.arange(len(self.days)), self.days)}
+        for resolution, starts in (('week', self.days - pd.to_timedelta(self.days.dayofweek, unit='D')),
+                                   ('month', self.days.to_period('M').to_timestamp())):
+            first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+            self.buckets[resolution] = (first, starts[first])
+
+    def region_names(self):
+        return sorted(set(self.regions))
+
+    def metro_names(self, region=ALL):
+        mask = self.regions == region if region != ALL else np.ones(len(self.regions), dtype=bool)
+        return sorted(set(self.metros[mask]))
+
+    def columns(self, region=ALL, metro=ALL):
+        mask = np.ones(len(self.regions), dtype=bool)
+        if region != ALL:
+            mask &= self.regions == region
+        if metro != ALL:
+            mask &= self.metros == metro
+        return np.flatnonzero(mask)
+
+    def series(self, region=ALL, metro=ALL, metric='sessions', resolution='month'):
+        """(period starts, values) of `metric` summed over the matching metros."""
+        daily = self.values[metric][:, self.columns(region, metro)].sum(axis=1)
+        first, starts = self.buckets[resolution]
+        return starts, np.add.reduceat(daily, first)
+
+
+def _load_store():
+    daily = ev_aggregates.load_daily()
+    if daily is None or not len(daily):
+        return None
+    return SeriesStore(daily)
+
+
+store = LazyInit("session series", _load_store)
+
+
+def series_payload(region=ALL, metro=ALL, metric='sessions', resolution='month', points=DEFAULT_POINTS):
+    """JSON-ready dict of one series downsampled to at most `points` points, or None without data."""
+    series_store = store.get()
+    if series_store is None or not len(series_store.columns(region, metro)):
+        return None
+    dates, values = series_store.series(region, metro, metric, resolution)
+    keep = lttb(dates.asi8, values, points)
+    return {
+        'region': region,
+        'metro_area': metro,
+        'metric': metric,
+        'resolution': resolution,
+        'total_points': len(values),
+        'x': dates[keep].strftime('%Y-%m-%d').tolist(),
+        'y': np.round(values[keep], DECIMALS).tolist(),
+    }
+
+
+def _bad_request(message):
+    response = flask.jsonify({'error': message})
+    response.status_code = 400
+    return response
+
+
+@blueprint.route("/api/series")
+def serve_series():
+    args = flask.request.args
+    metric = args.get('metric', 'sessions')
+    resolution = args.get('resolution', 'month')
+    if metric not in METRICS:
+        return _bad_request(f"metric must be one of {', '.join(METRICS)}")
+    if resolution not in RESOLUTIONS:
+        return _bad_request(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+    try:
+        points = min(max(int(args.get('points', DEFAULT_POINTS)), 3), MAX_POINTS)
+    except ValueError:
+        return _bad_request("points must be an integer")
+
+    payload = series_payload(args.get('region', ALL), args.get('metro', ALL), metric, resolution, points)
+    if payload is None:
+        flask.abort(404)
+    response = flask.jsonify(payload)
+    # The rollup only changes on a redeploy
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
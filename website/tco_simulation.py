@@ -0,0 +1,154 @@
+"""Monte Carlo cost-per-mile outlook for the EVvsGas page's simulation mode.
+
+The interactive section divides past prices by two fixed efficiencies. Here every scenario
+draws its own gas MPG, EV mi/kWh, charging loss, public charging fee and a path of future gas
+prices and electric rates from the Prophet price forecasts (forecasting.PRICE_FORECAST_PATH),
+and the result is percentile bands of cost per mile for each forecast month plus the mileage
+at which the EV's running-cost savings pay back its purchase premium.
+
+Scenarios are generated and reduced as arrays, never one at a time: each fixed-size chunk of
+scenarios is a handful of (scenarios x months) operations, and chunks (then the percentile
+columns) are spread over one thread pool shared by every request, so the number of threads
+stays bounded however many users run simulations. NumPy releases the GIL inside these
+operations, so the chunks run concurrently. The random stream is seeded per chunk, so a
+given set of inputs always returns the same bands and results can be memoized.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Threads shared by all simulations in this process
+SIMULATION_WORKERS = int(os.environ.get("SIMULATION_WORKERS", min(4, os.cpu_count() or 1)))
+DEFAULT_SCENARIOS = 20000
+MAX_SCENARIOS = 100000
+CHUNK_SIZE = 4096
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# forecasting fits Prophet with its default 80% interval, i.e. +-1.28 standard deviations
+INTERVAL_WIDTH = 0.8
+_INTERVAL_Z = NormalDist().inv_cdf(0.5 + INTERVAL_WIDTH / 2)
+
+# Spread of the efficiencies around the slider values (standard deviation as a share)
+EFFICIENCY_SPREAD = 0.1
+# Energy lost between the wall and the battery
+CHARGING_LOSS_RANGE = (0.10, 0.20)
+# What public (mostly DC fast) chargers add to the utility rate, $/kWh
+PUBLIC_FEE_RANGE = (0.15, 0.35)
+
+_pool = ThreadPoolExecutor(max_workers=SIMULATION_WORKERS, thread_name_prefix="simulation")
+
+
+class PriceOutlook:
+    """Forecast months with the gas and electric forecasts' means and standard deviations."""
+
+    def __init__(self, gas_forecast, elec_forecast):
+        future = (gas_forecast[gas_forecast['y'].isna()].set_index('ds')
+                  .join(elec_forecast[elec_forecast['y'].isna()].set_index('ds'),
+                        how='inner', lsuffix='_gas', rsuffix='_elec')
+                  .sort_index())
+        self.months = pd.DatetimeIndex(future.index)
+        self.gas, self.gas_sigma = self._moments(future, 'gas')
+        self.elec, self.elec_sigma = self._moments(future, 'elec')
+
+    @staticmethod
+    def _moments(future, suffix):
+        spread = future[f'yhat_upper_{suffix}'] - future[f'yhat_lower_{suffix}']
+        return (future[f'yhat_{suffix}'].to_numpy(dtype=float),
+                (spread / (2 * _INTERVAL_Z)).to_numpy(dtype=float))
+
+    def __len__(self):
+        return len(self.months)
+
+
+def price_outlook(gas_forecast, elec_forecast):
+    """A PriceOutlook from the 'forecast' rows of both price series, or None without them."""
+    if gas_forecast is None or elec_forecast is None:
+        return None
+    outlook = PriceOutlook(gas_forecast, elec_forecast)
+    return outlook if len(outlook) else None
+
+
+def _simulate_chunk(outlook, rows, seed, inputs, gas_out, ev_out, savings_out):
+    """Fills rows `rows` of the output arrays with one chunk of scenarios."""
+    mpg, mi_kwh, public_share, elec_scale, price_corr = inputs
+    n = rows.stop - rows.start
+    rng = np.random.default_rng([seed, rows.start])
+
+    # A scenario stays at one quantile of each forecast interval for the whole horizon, with
+    # the gas and electric draws correlated by `price_corr`
+    z_gas, z_other = rng.standard_normal((2, n))
+    z_elec = price_corr * z_gas + np.sqrt(1 - price_corr ** 2) * z_other
+    scenario_mpg = np.maximum(rng.normal(mpg, EFFICIENCY_SPREAD * mpg, n), mpg / 2)
+    scenario_mi_kwh = np.maximum(rng.normal(mi_kwh, EFFICIENCY_SPREAD * mi_kwh, n), mi_kwh / 2)
+    loss = rng.uniform(*CHARGING_LOSS_RANGE, n)
+    fee = rng.uniform(*PUBLIC_FEE_RANGE, n)
+
+    gas = gas_out[rows]
+    np.multiply.outer(z_gas, outlook.gas_sigma, out=gas)
+    gas += outlook.gas
+    gas /= scenario_mpg[:, None]
+
+    # Electricity bought per mile driven is 1 / (mi/kWh * (1 - loss)); a `public_share` of it
+    # is bought at a public charger for the utility rate plus that scenario's fee
+    ev = ev_out[rows]
+    np.multiply.outer(z_elec, outlook.elec_sigma, out=ev)
+    ev += outlook.elec
+    ev *= elec_scale
+    ev += (public_share * fee)[:, None]
+    ev /= (scenario_mi_kwh * (1 - loss))[:, None]
+
+    savings_out[rows] = gas.mean(axis=1) - ev.mean(axis=1)
+
+
+def _percentile_columns(values, columns, bands_out):
+    bands_out[:, columns] = np.percentile(values[:, columns], PERCENTILES, axis=0)
+
+
+def _run(tasks):
+    # Raises the first worker error, after every task has finished
+    for future in [_pool.submit(*task) for task in tasks]:
+        future.result()
+
+
+def simulate(outlook, mpg, mi_kwh, public_share=0.0, ev_premium=0.0, elec_scale=1.0,
+             price_corr=0.0, scenarios=DEFAULT_SCENARIOS, seed=0):
+    """Percentile bands of gas and EV cost per mile over the outlook, and break-even mileage.
+
+    `elec_scale` multiplies the electric forecast (for a region other than the forecast's),
+    `public_share` is the fraction of charging done at public chargers and `ev_premium` the
+    extra purchase price of the EV. Returns a dict of the months, PERCENTILES, 'gas' and 'ev'
+    arrays of shape (len(PERCENTILES), months), 'breakeven_miles' per percentile (inf where
+    the EV never pays back) and 'ev_cheaper', the share of scenarios in which it saves money.
+    """
+    scenarios = int(min(max(scenarios, 1), MAX_SCENARIOS))
+    months = len(outlook)
+    inputs = (float(mpg), float(mi_kwh), float(public_share), float(elec_scale), float(price_corr))
+    gas = np.empty((scenarios, months))
+    ev = np.empty((scenarios, months))
+    savings = np.empty(scenarios)
+
+    _run((_simulate_chunk, outlook, slice(start, min(start + CHUNK_SIZE, scenarios)), seed, inputs,
+          gas, ev, savings) for start in range(0, scenarios, CHUNK_SIZE))
+
+    gas_bands = np.empty((len(PERCENTILES), months))
+    ev_bands = np.empty((len(PERCENTILES), months))
+    column_groups = np.array_split(np.arange(months), min(SIMULATION_WORKERS, months))
+    _run([(_percentile_columns, values, columns, bands)
+          for values, bands in ((gas, gas_bands), (ev, ev_bands)) for columns in column_groups])
+
+    # Break-even mileage falls as savings rise, so its p-th percentile is the premium over
+    # the (100 - p)-th percentile of savings per mile
+    saved = np.percentile(savings, [100 - p for p in PERCENTILES])
+    breakeven = np.where(saved > 0, float(ev_premium) / np.where(saved > 0, saved, 1), np.inf)
+
+    return {
+        'months': outlook.months,
+        'percentiles': PERCENTILES,
+        'gas': gas_bands,
+        'ev': ev_bands,
+        'breakeven_miles': breakeven,
+        'ev_cheaper': float((savings > 0).mean()),
+    }
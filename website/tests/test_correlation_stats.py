@@ -0,0 +1,32 @@
+import numpy as np
+
+import correlation_stats
+
+
+def _series(n=72, seed=3):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.normal(size=n))
+    y = 0.5 * x + rng.normal(size=n)
+    y[[4, 30]] = np.nan
+    return x, y
+
+
+def test_bootstrap_corr_reproducible_with_seed():
+    x, y = _series()
+    first = correlation_stats.bootstrap_corr(x, y, resamples=3000, block=6, seed=7)
+    assert correlation_stats.bootstrap_corr(x, y, resamples=3000, block=6, seed=7) == first
+    assert correlation_stats.bootstrap_corr(x, y, resamples=3000, block=6, seed=8) != first
+
+    keep = ~np.isnan(y)
+    assert first['n'] == keep.sum()
+    assert np.isclose(first['r'], np.corrcoef(x[keep], y[keep])[0, 1])
+    assert first['ci_low'] <= first['r'] <= first['ci_high']
+    assert 0 < first['p_value'] <= 1
+
+
+def test_block_indices_are_runs():
+    rows = correlation_stats.block_indices(10, 4, 5, np.random.default_rng(0))
+    assert rows.shape == (5, 10)
+    assert rows.min() >= 0 and rows.max() < 10
+    # Each block of 4 is consecutive months
+    assert (np.diff(rows[:, :4], axis=1) == 1).all()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+import ev_aggregates
+
+
+def _sessions():
+    months = pd.to_datetime(['2023-01-01', '2023-01-01', '2023-02-01', '2023-02-01', '2023-02-01'])
+    return pd.DataFrame({
+        'year_month': months,
+        'start_datetime': months,
+        'region': ['Pacific', None, 'Pacific', 'Pacific', 'Pacific'],
+        'metro_area': ['Portland', 'Portland', None, 'Portland', 'Portland'],
+        'charge_level': ['L2'] * 5,
+        'energy_kwh': [10.0, 20.0, 5.0, 8.0, 12.0],
+    })
+
+
+def test_summarize_skips_nan_keys():
+    cube = ev_aggregates.build_cube([_sessions()])
+    assert cube['region'].isna().any() and cube['metro_area'].isna().any()
+
+    out = ev_aggregates.summarize(cube, by=['region', 'metro_area', 'year_month'])
+    assert list(out['sessions']) == [1, 2]
+    assert np.allclose(out['energy_kwh'], [10.0, 20.0])
+    assert np.allclose(out['energy_mean'], [10.0, 10.0])
+    assert out['energy_median'].notna().all()
+
+    # Grouping by month alone still counts the sessions without a region or metro
+    monthly = ev_aggregates.summarize(cube)
+    assert list(monthly['sessions']) == [2, 3]
@@ -0,0 +1,28 @@
+import pandas as pd
+
+import forecast_cache
+
+
+def _history():
+    return pd.DataFrame({'ds': pd.date_range('2022-01-01', periods=24, freq='MS'),
+                         'y': [float(i) for i in range(24)]})
+
+
+def test_fingerprint_tracks_series_and_settings():
+    history = _history()
+    key = forecast_cache.fingerprint(history, 12, 'MS', {'yearly_seasonality': True})
+
+    assert forecast_cache.fingerprint(_history(), 12, 'MS', {'yearly_seasonality': True}) == key
+    assert forecast_cache.fingerprint(history, 24, 'MS', {'yearly_seasonality': True}) != key
+    assert forecast_cache.fingerprint(history, 12, 'D', {'yearly_seasonality': True}) != key
+    assert forecast_cache.fingerprint(history, 12, 'MS', {'yearly_seasonality': False}) != key
+    changed = history.assign(y=history['y'].where(history.index != 5, 99.0))
+    assert forecast_cache.fingerprint(changed, 12, 'MS', {'yearly_seasonality': True}) != key
+
+
+def test_fingerprint_tracks_prophet_version(monkeypatch):
+    history = _history()
+    monkeypatch.setattr(forecast_cache, '_model_version', lambda: '1.1.5')
+    key = forecast_cache.fingerprint(history, 12, 'MS')
+    monkeypatch.setattr(forecast_cache, '_model_version', lambda: '1.1.6')
+    assert forecast_cache.fingerprint(history, 12, 'MS') != key
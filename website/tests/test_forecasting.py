@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+import forecasting
+from forecast_cache import fingerprint
+
+
+def _task(months):
+    history = pd.DataFrame({'ds': pd.date_range('2021-01-01', periods=months, freq='MS'),
+                            'y': np.linspace(10.0, 20.0, months)})
+    return forecasting.make_task({'region': 'Pacific'}, history)
+
+
+def _state(task, n, upper=100.0):
+    """The state saved after fitting the first `n` months, with a flat 0..upper interval."""
+    history = task['history'].iloc[:n]
+    future = pd.date_range(history['ds'].max(), periods=task['periods'] + 1, freq='MS')[1:]
+    return {
+        'n': n,
+        'fingerprint': fingerprint(history, task['periods'], task['freq'], task['params']),
+        'params': {'k': [0.1], 'm': [0.5], 'sigma_obs': [0.05], 'delta': [0.0] * 3, 'beta': [0.0] * 4},
+        'forecast': {'ds': future.strftime('%Y-%m-%d').tolist(),
+                     'lower': [0.0] * len(future), 'upper': [upper] * len(future)},
+    }
+
+
+def test_warm_start_within_interval():
+    task = _task(27)
+    init, reason = forecasting.warm_start_plan(task, _state(task, 24))
+    assert reason == 'warm start'
+    assert init['k'] == 0.1 and init['sigma_obs'] == 0.05
+    assert init['delta'].shape == (3,)
+
+
+def test_drift_falls_back_to_cold_fit():
+    task = _task(27)
+    # The appended months (about 19.6 to 20) are all above the stored interval
+    init, reason = forecasting.warm_start_plan(task, _state(task, 24, upper=15.0))
+    assert init is None and reason == 'drift'
+
+    # Two of three months outside stays above DRIFT_TOLERANCE; one of three doesn't
+    state = _state(task, 24)
+    state['forecast']['upper'][:2] = [15.0, 15.0]
+    assert forecasting.warm_start_plan(task, state) == (None, 'drift')
+    state['forecast']['upper'][1] = 100.0
+    assert forecasting.warm_start_plan(task, state)[1] == 'warm start'
+
+
+def test_changed_history_falls_back_to_cold_fit():
+    task = _task(27)
+    state = _state(task, 24)
+    task['history'].loc[3, 'y'] = 0.0
+    assert forecasting.warm_start_plan(task, state) == (None, 'history or settings changed')
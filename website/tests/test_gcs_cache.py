@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+import pytest
+
+import gcs_cache
+
+BUCKET = "test-bucket"
+BLOB = "data/prices.csv"
+
+
+@pytest.fixture
+def bucket_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(gcs_cache, "LOCAL_BUCKET_DIR", str(tmp_path / "buckets"))
+    monkeypatch.setattr(gcs_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "buckets" / BUCKET
+    (root / "data").mkdir(parents=True)
+    return root
+
+
+def _write_blob(root, text, generation):
+    path = root / BLOB
+    path.write_text(text)
+    # LocalBlob takes its generation from the file's mtime
+    os.utime(path, ns=(generation, generation))
+
+
+def test_cache_hit_skips_download(bucket_dir, monkeypatch):
+    _write_blob(bucket_dir, "a,b\n1,2\n", 1_000_000_000)
+    first = gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=0)
+
+    def no_download(self, if_generation_match=None):
+        raise AssertionError("cached blob was downloaded again")
+
+    monkeypatch.setattr(gcs_cache.LocalBlob, "download_as_bytes", no_download)
+    pd.testing.assert_frame_equal(gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=0), first)
+
+
+def test_changed_generation_is_parsed_again(bucket_dir):
+    _write_blob(bucket_dir, "a,b\n1,2\n", 1_000_000_000)
+    assert gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=0)['a'].tolist() == [1]
+
+    _write_blob(bucket_dir, "a,b\n3,4\n", 2_000_000_000)
+    assert gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=0)['a'].tolist() == [3]
+
+
+def test_integer_columns_survive_parquet_round_trip(bucket_dir):
+    _write_blob(bucket_dir, "1,2\n3,4\n", 1_000_000_000)
+    fresh = gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=None)
+    cached = gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=None)
+
+    assert cached.columns.tolist() == [0, 1]
+    assert cached[0].dtype == 'int64'
+    pd.testing.assert_frame_equal(cached, fresh)
+
+
+def test_cached_copy_served_when_metadata_lookup_fails(bucket_dir, monkeypatch):
+    _write_blob(bucket_dir, "a,b\n1,2\n", 1_000_000_000)
+    first = gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=0)
+
+    def unavailable(self, blob_name):
+        raise ConnectionError("storage unavailable")
+
+    monkeypatch.setattr(gcs_cache.LocalBucket, "get_blob", unavailable)
+    pd.testing.assert_frame_equal(gcs_cache.get_csv_from_gcs(BUCKET, BLOB, header=0), first)
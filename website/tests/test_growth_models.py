@@ -0,0 +1,33 @@
+import numpy as np
+
+import growth_models
+
+
+def test_fit_growth_matches_polyfit():
+    rng = np.random.default_rng(0)
+    days = np.arange(12) * 30 + 737000
+    values = rng.uniform(50, 150, (4, 12)) * np.exp(0.02 * np.arange(12))
+    values[1, [0, 5, 6]] = np.nan
+    values[2, 3:] = np.nan
+
+    out = growth_models.fit_growth(values, days)
+
+    for row in (0, 1):
+        observed = ~np.isnan(values[row])
+        x, y = days[observed], values[row, observed]
+        slope, _ = np.polyfit(x, y, 1)
+        exp_slope, _ = np.polyfit(x, np.log(y + growth_models.LOG_OFFSET), 1)
+        assert out['n_months'][row] == observed.sum()
+        assert np.isclose(out['linear_growth_pct'][row],
+                          slope * growth_models.DAYS_PER_MONTH / y.mean() * 100)
+        assert np.isclose(out['exp_growth_pct'][row],
+                          (np.exp(exp_slope * growth_models.DAYS_PER_MONTH) - 1) * 100)
+        fitted = np.polyval(np.polyfit(x, y, 1), x)
+        r2 = 1 - ((y - fitted) ** 2).sum() / ((y - y.mean()) ** 2).sum()
+        assert np.isclose(out['linear_r2'][row], r2)
+
+    # Fewer than MIN_POINTS months gets no fit
+    assert out['n_months'][2] == 3
+    values[3, 2:] = np.nan
+    short = growth_models.fit_growth(values, days)
+    assert np.isnan(short['linear_growth_pct'][3]) and np.isnan(short['exp_r2'][3])
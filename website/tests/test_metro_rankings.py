@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+import ev_aggregates
+import metro_rankings
+
+
+def _sessions(months, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i, month in enumerate(pd.to_datetime(months)):
+        for region, metro in [('Pacific', 'Portland'), ('Pacific', 'Seattle'),
+                              ('Mountain', 'Denver'), ('Mountain', 'Undesignated')]:
+            count = int(rng.integers(5, 20)) + 3 * i
+            rows.append(pd.DataFrame({
+                'year_month': [month] * count,
+                'start_datetime': [month] * count,
+                'region': region,
+                'metro_area': metro,
+                'charge_level': rng.choice(['L2', 'DCFC'], count),
+                'energy_kwh': rng.uniform(1, 40, count),
+            }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def _save_cube(sessions, path):
+    ev_aggregates.save_cube(ev_aggregates.build_cube([sessions]), str(path))
+    return str(path)
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    early = _sessions(['2022-01-01', '2022-02-01', '2022-03-01', '2022-04-01'])
+    # April was still partial at the first update; the second adds the rest of it and two months
+    late = pd.concat([early, _sessions(['2022-04-01', '2022-05-01', '2022-06-01'], seed=1)],
+                     ignore_index=True)
+
+    incremental = tmp_path / 'incremental.parquet'
+    metro_rankings.update_rankings(_save_cube(early, tmp_path / 'early.parquet'), incremental, full=True)
+    updated = metro_rankings.update_rankings(_save_cube(late, tmp_path / 'late.parquet'), incremental)
+    rebuilt = metro_rankings.update_rankings(str(tmp_path / 'late.parquet'), tmp_path / 'full.parquet',
+                                             full=True)
+
+    assert 'Undesignated' not in set(rebuilt['metro_area'])
+    assert updated.attrs['settled_before'] == rebuilt.attrs['settled_before'] == '2022-06-01'
+    columns = [c for c in rebuilt.columns if not c.startswith('settled_')]
+    pd.testing.assert_frame_equal(
+        updated[columns].sort_values(metro_rankings.KEYS, ignore_index=True),
+        rebuilt[columns].sort_values(metro_rankings.KEYS, ignore_index=True),
+    )
+    # What the next update starts from is the same too
+    stored = metro_rankings.load_rankings(incremental)
+    assert np.allclose(stored.sort_values(metro_rankings.KEYS)['settled_total_sessions'],
+                       rebuilt.sort_values(metro_rankings.KEYS)['settled_total_sessions'])
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+import price_analytics
+
+
+def _prices(n=60, seed=1):
+    rng = np.random.default_rng(seed)
+    gas = 3 + np.cumsum(rng.normal(0, 0.1, n))
+    elec = 0.2 + 0.01 * gas + rng.normal(0, 0.005, n)
+    return gas, elec
+
+
+def test_rolling_stats_match_pandas():
+    gas, elec = _prices()
+    windows = [3, 6, 12]
+
+    std = price_analytics.rolling_std(gas, windows)
+    corr = price_analytics.rolling_corr(gas, elec, windows)
+    for i, window in enumerate(windows):
+        expected_std = pd.Series(gas).rolling(window).std().to_numpy()
+        expected_corr = pd.Series(gas).rolling(window).corr(pd.Series(elec)).to_numpy()
+        assert np.allclose(std[i], expected_std, equal_nan=True)
+        assert np.allclose(corr[i], expected_corr, equal_nan=True)
+
+    # An int window returns a single row
+    assert np.allclose(price_analytics.rolling_std(gas, 6), std[1], equal_nan=True)
+
+
+def test_cross_correlation_matches_corrcoef():
+    gas, elec = _prices(n=40, seed=2)
+    lags, corr = price_analytics.cross_correlation(gas, elec, max_lag=6)
+
+    assert list(lags) == list(range(-6, 7))
+    for lag, value in zip(lags, corr):
+        if lag >= 0:
+            x, y = gas[:len(gas) - lag], elec[lag:]
+        else:
+            x, y = gas[-lag:], elec[:len(elec) + lag]
+        assert np.isclose(value, np.corrcoef(x, y)[0, 1])
@@ -0,0 +1,51 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+import tco_simulation
+
+
+def _forecast(level, spread, months=12):
+    ds = pd.date_range('2023-01-01', periods=24 + months, freq='MS')
+    yhat = level * (1 + 0.002 * np.arange(len(ds)))
+    return pd.DataFrame({
+        'ds': ds,
+        'y': np.where(np.arange(len(ds)) < 24, yhat, np.nan),
+        'yhat': yhat,
+        'yhat_lower': yhat - spread,
+        'yhat_upper': yhat + spread,
+    })
+
+
+def _outlook():
+    return tco_simulation.price_outlook(_forecast(3.5, 0.4), _forecast(0.25, 0.03))
+
+
+def test_price_outlook_covers_forecast_months():
+    outlook = _outlook()
+    assert len(outlook) == 12
+    assert outlook.months[0] == pd.Timestamp('2025-01-01')
+    # The 80% interval spans +-1.28 standard deviations
+    assert np.allclose(outlook.gas_sigma, 0.4 / NormalDist().inv_cdf(0.9))
+    assert tco_simulation.price_outlook(None, _forecast(0.25, 0.03)) is None
+
+
+def test_simulate_deterministic_with_seed():
+    outlook = _outlook()
+    args = dict(mpg=30, mi_kwh=3.5, public_share=0.2, ev_premium=8000, price_corr=0.3,
+                scenarios=10000, seed=11)
+    first = tco_simulation.simulate(outlook, **args)
+    again = tco_simulation.simulate(outlook, **args)
+    for name in ('gas', 'ev', 'breakeven_miles'):
+        assert np.array_equal(first[name], again[name])
+    assert first['ev_cheaper'] == again['ev_cheaper']
+    assert not np.array_equal(tco_simulation.simulate(outlook, **{**args, 'seed': 12})['gas'], first['gas'])
+
+    # Bands are ordered by percentile in every month, and so is the break-even mileage
+    assert first['gas'].shape == first['ev'].shape == (len(tco_simulation.PERCENTILES), 12)
+    assert (np.diff(first['gas'], axis=0) >= 0).all()
+    assert (np.diff(first['ev'], axis=0) >= 0).all()
+    assert (np.diff(first['breakeven_miles']) >= 0).all()
+    # Median gas cost per mile is close to the forecast price over the MPG
+    assert np.allclose(first['gas'][2], outlook.gas / 30, rtol=0.05)